@@ -0,0 +1,55 @@
+from __future__ import annotations
+import os
+import sys
+import glob
+import pickle
+import shutil
+import hashlib
+from typing import Optional
+from pylox.stmt import Stmt
+from pylox.chunk import FunctionProto
+
+# On disk cache of resolved programs, the pylox counterpart of __pycache__. Entries live next to the script
+# in __loxcache__/<script name>.<variant>.<hash>.pickle where the hash covers the script's bytes, VERSION, the python
+# version and the variant (optimized or not), so editing the script or upgrading pylox just misses and replaces the
+# stale entry of that variant. The key passed around is "<variant>.<hash>".
+
+CACHE_DIR: str = "__loxcache__"
+VERSION: str = "10" # bump whenever the Token, AST, Slot or bytecode layout changes
+
+class Program: # everything the front end produces for a script
+    def __init__(self, statements: list[Stmt], warnings: list[str], frame_size: int = 0, bytecode: Optional[FunctionProto] = None):
+        self.statements = statements # resolved, the Slot annotations pickle along with the nodes
+        self.warnings = warnings # resolver warnings, replayed on a cache hit
+        self.frame_size = frame_size # slots the tree-walker reserves for locals of top level blocks
+        self.bytecode = bytecode # only present once the script has been run with --engine=vm
+
+def source_key(script: str, optimized: bool = False) -> str:
+    variant: str = "opt" if optimized else "std"
+    digest = hashlib.sha256(f"{VERSION}:{sys.version_info[0]}.{sys.version_info[1]}:{variant}:".encode())
+    with open(script, mode="rb") as file:
+        while chunk := file.read(1 << 16): digest.update(chunk)
+    return f"{variant}.{digest.hexdigest()[:16]}"
+
+def entry_path(script: str, key: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(script)), CACHE_DIR, f"{os.path.basename(script)}.{key}.pickle")
+
+def load(script: str, key: str) -> Optional[Program]:
+    try:
+        with open(entry_path(script, key), mode="rb") as file: return pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError): return None # missing or unreadable entry is a miss
+
+def store(script: str, key: str, program: Program) -> None:
+    path: str = entry_path(script, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        variant: str = key.split(".")[0] # the other variant's entry stays, runs may alternate between them
+        for stale in glob.glob(os.path.join(glob.escape(os.path.dirname(path)), glob.escape(f"{os.path.basename(script)}.{variant}.") + "*.pickle")):
+            if stale != path: os.remove(stale)
+        with open(path + ".tmp", mode="wb") as file: pickle.dump(program, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path) # never leave a half written entry behind for a concurrent run
+    except (OSError, pickle.PicklingError, RecursionError): pass # caching is best effort, the run doesn't depend on it
+
+def clear(script: Optional[str]) -> None:
+    directory: str = os.path.dirname(os.path.abspath(script)) if script is not None else os.getcwd()
+    shutil.rmtree(os.path.join(directory, CACHE_DIR), ignore_errors=True)
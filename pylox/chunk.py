@@ -0,0 +1,89 @@
+from __future__ import annotations
+from enum import IntEnum, auto
+from typing import Optional
+from pylox.tokens import Token
+
+class OpCode(IntEnum):
+    # Constants and stack.
+    CONSTANT = auto(); NIL = auto(); TRUE = auto(); FALSE = auto(); POP = auto()
+
+    # Variables. GET_LOCAL0/GET_LOCAL1 are the depth 0 and 1 fast paths of GET_LOCAL.
+    GET_LOCAL0 = auto(); GET_LOCAL1 = auto(); GET_LOCAL = auto(); SET_LOCAL = auto(); DEFINE_LOCAL = auto()
+    GET_GLOBAL = auto(); SET_GLOBAL = auto(); DEFINE_GLOBAL = auto()
+    STORE_LOCAL = auto(); STORE_GLOBAL = auto() # assignment statements, SET_* without leaving the value on the stack
+    PUSH_ENV = auto(); POP_ENV = auto()
+
+    # Operators.
+    ADD = auto(); SUBTRACT = auto(); MULTIPLY = auto(); DIVIDE = auto()
+    GREATER = auto(); GREATER_EQUAL = auto(); LESS = auto(); LESS_EQUAL = auto()
+    EQUAL = auto(); NOT_EQUAL = auto(); NEGATE = auto(); NOT = auto()
+    ADD_CONSTANT = auto(); SUBTRACT_CONSTANT = auto(); LESS_CONSTANT = auto() # right operand is a number constant
+
+    # Control flow. Jump operands are absolute offsets into the chunk.
+    JUMP = auto(); JUMP_IF_FALSE = auto(); JUMP_IF_FALSE_KEEP = auto(); JUMP_IF_TRUE_KEEP = auto()
+
+    # Functions, classes and properties.
+    CALL = auto(); CLOSURE = auto(); RETURN = auto(); RETURN_THIS = auto()
+    MEMO_STORE = auto() # never compiled, the vm runs it between a memoized function's RETURN and its caller
+    GET_METHOD = auto(); CALL_METHOD = auto() # obj.method(...) without a bound method, GET_METHOD always precedes a GET_PROPERTY
+    CLASS = auto(); INHERIT = auto()
+    GET_PROPERTY = auto(); SET_PROPERTY = auto(); CHECK_INSTANCE = auto()
+    GET_INDEX = auto(); SET_INDEX = auto() # obj[index], the operands are on the stack
+    GET_SUPER = auto(); GET_INNER = auto()
+
+    PRINT = auto()
+
+class Chunk:
+    def __init__(self):
+        self.code: list[int] = [] # flat opcode/operand array
+        self.constants: list[object] = []
+        self.tokens: dict[int, Token] = {} # key:value -> opcode_offset:token, only for instructions that can raise at runtime
+
+    def write(self, op: OpCode, *operands: int, token: Optional[Token] = None) -> int:
+        offset: int = len(self.code)
+        if token is not None: self.tokens[offset] = token
+        self.code.append(op)
+        self.code.extend(operands)
+        return offset
+
+    def add_constant(self, value: object) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def disassemble(self, name: str) -> str:
+        res = f"== {name} ==\n"
+        offset: int = 0
+        while offset < len(self.code):
+            op: OpCode = OpCode(self.code[offset])
+            width: int = OPERAND_COUNTS.get(op, 0)
+            operands = self.code[offset + 1:offset + 1 + width]
+            res += f"{offset:04d} {op.name:<18} {' '.join(str(o) for o in operands)}\n"
+            offset += 1 + width
+        return res
+
+OPERAND_COUNTS: dict[OpCode, int] = {
+    OpCode.CONSTANT: 1,
+    OpCode.GET_LOCAL0: 1, OpCode.GET_LOCAL1: 1, OpCode.GET_LOCAL: 2, OpCode.SET_LOCAL: 2,
+    OpCode.GET_GLOBAL: 1, OpCode.SET_GLOBAL: 1, OpCode.DEFINE_GLOBAL: 1,
+    OpCode.STORE_LOCAL: 2, OpCode.STORE_GLOBAL: 1,
+    OpCode.ADD_CONSTANT: 1, OpCode.SUBTRACT_CONSTANT: 1, OpCode.LESS_CONSTANT: 1,
+    OpCode.JUMP: 1, OpCode.JUMP_IF_FALSE: 1, OpCode.JUMP_IF_FALSE_KEEP: 1, OpCode.JUMP_IF_TRUE_KEEP: 1,
+    OpCode.CALL: 1, OpCode.CALL_METHOD: 1, OpCode.CLOSURE: 1, OpCode.CLASS: 1, OpCode.INHERIT: 1,
+    OpCode.GET_PROPERTY: 2, OpCode.SET_PROPERTY: 2,
+    OpCode.GET_SUPER: 3, OpCode.GET_INNER: 2,
+}
+
+class FunctionProto: # compile time half of a function, the runtime half (closure environment) lives in VMFunction
+    def __init__(self, name: Optional[Token], arity: int, is_initializer: bool = False, is_getter: bool = False):
+        self.name = name # None for lambdas and the top level script
+        self.arity = arity
+        self.is_initializer = is_initializer
+        self.is_getter = is_getter
+        self.chunk: Chunk = Chunk()
+
+class ClassProto:
+    def __init__(self, name: Token, method_names: list[str], class_method_names: list[str], has_superclass: bool):
+        self.name = name
+        self.method_names = method_names
+        self.class_method_names = class_method_names
+        self.has_superclass = has_superclass
@@ -0,0 +1,574 @@
+from __future__ import annotations
+from typing import Callable, Optional
+from pylox.interpreter import Interpreter
+from pylox.expr import Expr, Literal, Grouping, Unary, Binary, Ternary, Variable, Assign, Logical, Call, Lambda, Get, Set, This, Super, Inner, Index, SetIndex
+from pylox.stmt import Stmt, Expression, Print, Var, Block, If, While, Break, Function, Return, Class
+from pylox.tokens import Token
+from pylox.tokentype import TokenType
+from pylox.runtime_error import PyloxRuntimeError, NativeError
+from pylox.error import ErrorReporter
+from pylox.environment import UnInitValue
+from pylox.lox_callable import LoxCallable
+from pylox.natives import NativeFunction, NativeInstance, binary
+from pylox.lox_class import LoxClass
+from pylox.lox_instance import LoxInstance
+from pylox.inline_cache import InlineCache, SetCache
+from pylox.control_flow_signal import BREAK
+
+# Every node is compiled once into a Python closure taking the runtime environment, a list laid out like
+# the VM's: [enclosing, value_0, value_1, ...]. Expression closures return their value, statement closures
+# return a completion: None to carry on, BREAK, or a 1-tuple holding the value of a return.
+Env = list
+ExprFn = Callable[[Env], object]
+StmtFn = Callable[[Env], object]
+
+UNDEFINED: UnInitValue = UnInitValue() # globals.get() default, shares the class check with uninitialized variables
+
+class ClosureFunction(LoxCallable):
+    __hash__ = None # like the tree-walker's LoxFunction, so memo() runs calls with a function argument uncached on every engine
+
+    def __init__(self, name: Optional[Token], arity: int, body: StmtFn, env: Env, is_initializer: bool, is_getter: bool):
+        self.name = name # None for lambdas
+        self.params = arity
+        self.body = body
+        self.env = env
+        self.is_initializer = is_initializer
+        self.is_getter = is_getter
+
+    def bind(self, instance: LoxInstance) -> ClosureFunction:
+        return ClosureFunction(self.name, self.params, self.body, [self.env, instance], self.is_initializer, self.is_getter)
+
+    def call_bound(self, instance: LoxInstance, arguments: list[object]) -> object: # bind(instance).call() without the bound function
+        completion: object = self.body([[self.env, instance], *arguments])
+        if self.is_initializer: return instance
+        if completion.__class__ is tuple: return completion[0]
+        return None
+
+    def call(self, interpreter: Interpreter, arguments: list[object]) -> object:
+        completion: object = self.body([self.env, *arguments])
+        if self.is_initializer: return self.env[1]
+        if completion.__class__ is tuple: return completion[0]
+        return None
+
+    def arity(self) -> int:
+        return self.params
+
+    def __str__(self) -> str:
+        if self.name is None: return "<lambda fn>"
+        return f"<fn {self.name.lexeme}>"
+
+class ClosureCompiler:
+    """Engine that turns each Stmt/Expr into a tree of specialized Python closures in a single pass.
+
+    Operators are picked at compile time and the resolver's (depth, unique_idx) pairs are baked into the
+    variable access closures, so running a node is one Python call with no accept/match dispatch.
+    """
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter # provides natives, C3 mro, stringify and the resolver results
+        self.globals: dict[str, object] = {}
+        for name, idx in interpreter.global_idxs.items(): self.globals[name] = interpreter.globals.get_at(0, name, idx)
+        self.function_depth: int = 0
+        self.env_depth: int = 0 # environments opened by blocks since the start of the current function
+        self.scopes: list[bool] = [] # one entry per resolver scope, innermost last, True if it has a runtime environment
+
+    def interpret(self, statements: list[Stmt]) -> None:
+        program: StmtFn = self.compile_block(statements)
+        try: program([None])
+        except PyloxRuntimeError as error: ErrorReporter.runtime_error(error)
+
+    def evaluate(self, expr: Optional[Expr]) -> object:
+        if expr is None: return None
+        return self.compile_expr(expr)([None])
+
+    def stringify(self, obj: object) -> str:
+        return self.interpreter.stringify(obj)
+
+    def compile_expr(self, expr: Expr) -> ExprFn:
+        return expr.accept(self)
+
+    def compile_stmt(self, stmt: Stmt) -> StmtFn:
+        return stmt.accept(self)
+
+    def compile_block(self, statements: list[Stmt | None]) -> StmtFn:
+        fns: tuple[StmtFn, ...] = tuple(self.compile_stmt(s) for s in statements if s is not None)
+        if len(fns) == 1: return fns[0]
+        def block(env: Env) -> object:
+            for fn in fns:
+                completion = fn(env)
+                if completion is not None: return completion
+            return None
+        return block
+
+    def is_global_scope(self) -> bool:
+        return self.function_depth == 0 and self.env_depth == 0
+
+    def runtime_depth(self, depth: int) -> int:
+        if depth == 0: return 0
+        return sum(self.scopes[-depth:]) # skip the scopes that have no runtime environment
+
+    def define(self, name: Token, value: ExprFn) -> StmtFn:
+        if self.is_global_scope():
+            globals: dict[str, object] = self.globals
+            lexeme: str = name.lexeme
+            def define_global(env: Env) -> None: globals[lexeme] = value(env)
+            return define_global
+        def define_local(env: Env) -> None: env.append(value(env))
+        return define_local
+
+    def getter(self, expr: This | Variable, name: Token) -> ExprFn:
+        if expr.slot.depth is None:
+            globals: dict[str, object] = self.globals
+            lexeme: str = name.lexeme
+            def get_global(env: Env) -> object:
+                value = globals.get(lexeme, UNDEFINED)
+                if value.__class__ is UnInitValue: # also catches UNDEFINED
+                    if lexeme not in globals: raise PyloxRuntimeError(name, f"Undefined variable '{lexeme}'.")
+                    raise PyloxRuntimeError(name, f"Variable '{lexeme}' accessed before its initialized or assigned.")
+                return value
+            return get_global
+        depth, slot = self.runtime_depth(expr.slot.depth), expr.slot.idx + 1
+        if depth == 0: return lambda env: env[slot]
+        if depth == 1: return lambda env: env[0][slot]
+        if depth == 2: return lambda env: env[0][0][slot]
+        def get_local(env: Env) -> object:
+            for _ in range(depth): env = env[0]
+            return env[slot]
+        return get_local
+
+    def setter(self, expr: Assign, value: ExprFn) -> ExprFn:
+        if expr.slot.depth is None:
+            globals: dict[str, object] = self.globals
+            name: Token = expr.name
+            def set_global(env: Env) -> object:
+                result = value(env)
+                if name.lexeme not in globals: raise PyloxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+                globals[name.lexeme] = result
+                return result
+            return set_global
+        depth, slot = self.runtime_depth(expr.slot.depth), expr.slot.idx + 1
+        if depth == 0:
+            def set_local0(env: Env) -> object:
+                env[slot] = result = value(env)
+                return result
+            return set_local0
+        if depth == 1:
+            def set_local1(env: Env) -> object:
+                env[0][slot] = result = value(env)
+                return result
+            return set_local1
+        def set_local(env: Env) -> object:
+            result = value(env)
+            for _ in range(depth): env = env[0]
+            env[slot] = result
+            return result
+        return set_local
+
+    def function(self, declaration: Function | Lambda, name: Optional[Token], is_initializer: bool, is_getter: bool) -> ExprFn:
+        enclosing: tuple[int, int] = (self.function_depth, self.env_depth)
+        self.function_depth, self.env_depth = self.function_depth + 1, 0
+        self.scopes.append(True)
+        body: StmtFn = self.compile_block(declaration.body)
+        self.scopes.pop()
+        self.function_depth, self.env_depth = enclosing
+        arity: int = len(declaration.params)
+        return lambda env: ClosureFunction(name, arity, body, env, is_initializer, is_getter)
+
+    def visit_Block_Stmt(self, stmt: Block) -> StmtFn:
+        if not any(isinstance(statement, (Var, Function, Class)) for statement in stmt.statements):
+            self.scopes.append(False)
+            body: StmtFn = self.compile_block(stmt.statements)
+            self.scopes.pop()
+            return body
+        self.env_depth += 1
+        self.scopes.append(True)
+        body = self.compile_block(stmt.statements)
+        self.scopes.pop()
+        self.env_depth -= 1
+        return lambda env: body([env])
+
+    def visit_Class_Stmt(self, stmt: Class) -> StmtFn:
+        superclass_fns: list[ExprFn] = [self.compile_expr(sc) for sc in stmt.superclasses]
+        if superclass_fns:
+            self.env_depth += 1
+            self.scopes.append(True)
+        self.scopes.append(True) # 'this', created when a method gets bound
+        methods: list[tuple[str, ExprFn]] = [(m.name.lexeme, self.function(m, m.name, m.name.lexeme == "init", m.is_getter)) for m in stmt.methods]
+        class_methods: list[tuple[str, ExprFn]] = [(m.name.lexeme, self.function(m, m.name, False, m.is_getter)) for m in stmt.class_methods]
+        self.scopes.pop()
+        if superclass_fns:
+            self.scopes.pop()
+            self.env_depth -= 1
+        interpreter: Interpreter = self.interpreter
+        name: Token = stmt.name
+        first_superclass: Optional[Token] = stmt.superclasses[0].name if stmt.superclasses else None
+        def make_class(env: Env) -> LoxClass:
+            superclasses: list[object] = [sc(env) for sc in superclass_fns]
+            if superclass_fns:
+                if not all(isinstance(sc, LoxClass) for sc in superclasses): raise PyloxRuntimeError(first_superclass, "Superclass must be a class.")
+                env = [env, superclasses]
+            klass: LoxClass = LoxClass(name.lexeme, superclasses, {n: fn(env) for n, fn in methods}, [])
+            klass.fields = {n: fn(env) for n, fn in class_methods}
+            klass.mro = interpreter.mro(klass, name)
+            klass.build_vtables()
+            return klass
+        # defining the name only once the class exists is equivalent to the tree-walker's define(None) then assign
+        return self.define(stmt.name, make_class)
+
+    def visit_Expression_Stmt(self, stmt: Expression) -> StmtFn:
+        expression: ExprFn = self.compile_expr(stmt.expression)
+        def expression_stmt(env: Env) -> None: expression(env)
+        return expression_stmt
+
+    def visit_Function_Stmt(self, stmt: Function) -> StmtFn:
+        return self.define(stmt.name, self.function(stmt, stmt.name, False, stmt.is_getter))
+
+    def visit_If_Stmt(self, stmt: If) -> StmtFn:
+        condition: ExprFn = self.compile_expr(stmt.condition)
+        then_branch: StmtFn = self.compile_stmt(stmt.then_branch)
+        if stmt.else_branch is None:
+            def if_then(env: Env) -> object:
+                value = condition(env)
+                if value is None or value is False: return None
+                return then_branch(env)
+            return if_then
+        else_branch: StmtFn = self.compile_stmt(stmt.else_branch)
+        def if_else(env: Env) -> object:
+            value = condition(env)
+            if value is None or value is False: return else_branch(env)
+            return then_branch(env)
+        return if_else
+
+    def visit_Print_Stmt(self, stmt: Print) -> StmtFn:
+        expression: ExprFn = self.compile_expr(stmt.expression)
+        stringify = self.interpreter.stringify
+        def print_stmt(env: Env) -> None: print(stringify(expression(env)))
+        return print_stmt
+
+    def visit_Return_Stmt(self, stmt: Return) -> StmtFn:
+        if stmt.value is None: return lambda env: (None,)
+        value: ExprFn = self.compile_expr(stmt.value)
+        return lambda env: (value(env),)
+
+    def visit_Var_Stmt(self, stmt: Var) -> StmtFn:
+        if isinstance(stmt.initializer, UnInitValue):
+            uninit: UnInitValue = stmt.initializer
+            return self.define(stmt.name, lambda env: uninit)
+        return self.define(stmt.name, self.compile_expr(stmt.initializer))
+
+    def visit_While_Stmt(self, stmt: While) -> StmtFn:
+        condition: ExprFn = self.compile_expr(stmt.condition)
+        body: StmtFn = self.compile_stmt(stmt.body)
+        def while_stmt(env: Env) -> object:
+            while True:
+                value = condition(env)
+                if value is None or value is False: return None
+                completion = body(env)
+                if completion is not None:
+                    if completion is BREAK: return None
+                    return completion
+        return while_stmt
+
+    def visit_Break_Stmt(self, stmt: Break) -> StmtFn:
+        return lambda env: BREAK
+
+    def visit_Literal_Expr(self, expr: Literal) -> ExprFn:
+        value: object = expr.value
+        return lambda env: value
+
+    def visit_Grouping_Expr(self, expr: Grouping) -> ExprFn:
+        return self.compile_expr(expr.expression)
+
+    def visit_Unary_Expr(self, expr: Unary) -> ExprFn:
+        right: ExprFn = self.compile_expr(expr.right)
+        operator: Token = expr.operator
+        match operator.token_type:
+            case TokenType.MINUS:
+                def negate(env: Env) -> object:
+                    value = right(env)
+                    if value.__class__ is not float: raise PyloxRuntimeError(operator, "Operand must be a number.")
+                    return -value
+                return negate
+            case TokenType.BANG:
+                def not_(env: Env) -> object:
+                    value = right(env)
+                    return value is None or value is False
+                return not_
+            case _:
+                def nil(env: Env) -> object:
+                    right(env)
+                    return None
+                return nil
+
+    def visit_Binary_Expr(self, expr: Binary) -> ExprFn:
+        left: ExprFn = self.compile_expr(expr.left)
+        right: ExprFn = self.compile_expr(expr.right)
+        operator: Token = expr.operator
+        match operator.token_type:
+            case TokenType.PLUS:
+                if isinstance(expr.right, Literal) and isinstance(expr.right.value, float):
+                    constant: float = expr.right.value
+                    def add_constant(env: Env) -> object:
+                        l = left(env)
+                        if l.__class__ is float: return l + constant
+                        if isinstance(l, str): return l + str(constant)[:-2]
+                        return binary(operator, l, constant, "Operands must be numbers or strings.")
+                    return add_constant
+                def add(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    if l.__class__ is float and r.__class__ is float: return l + r
+                    if isinstance(l, str) or isinstance(r, str):
+                        return (str(l)[:-2] if isinstance(l, float) else str(l)) + (str(r)[:-2] if isinstance(r, float) else str(r))
+                    return binary(operator, l, r, "Operands must be numbers or strings.")
+                return add
+            case TokenType.MINUS:
+                if isinstance(expr.right, Literal) and isinstance(expr.right.value, float):
+                    constant = expr.right.value
+                    def subtract_constant(env: Env) -> object:
+                        l = left(env)
+                        if l.__class__ is not float: return binary(operator, l, constant, "Operands must be numbers.")
+                        return l - constant
+                    return subtract_constant
+                def subtract(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    if l.__class__ is not float or r.__class__ is not float: return binary(operator, l, r, "Operands must be numbers.")
+                    return l - r
+                return subtract
+            case TokenType.STAR:
+                def multiply(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    if l.__class__ is not float or r.__class__ is not float: return binary(operator, l, r, "Operands must be numbers.")
+                    return l * r
+                return multiply
+            case TokenType.SLASH:
+                def divide(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    if l.__class__ is not float or r.__class__ is not float: return binary(operator, l, r, "Operands must be numbers.")
+                    if r == 0: raise PyloxRuntimeError(operator, "Cannot divide by zero.")
+                    return l / r
+                return divide
+            case TokenType.GREATER:
+                def greater(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    if l.__class__ is not float or r.__class__ is not float: return binary(operator, l, r, "Operands must be numbers.")
+                    return l > r
+                return greater
+            case TokenType.GREATER_EQUAL:
+                def greater_equal(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    if l.__class__ is not float or r.__class__ is not float: return binary(operator, l, r, "Operands must be numbers.")
+                    return l >= r
+                return greater_equal
+            case TokenType.LESS:
+                def less(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    if l.__class__ is not float or r.__class__ is not float: return binary(operator, l, r, "Operands must be numbers.")
+                    return l < r
+                return less
+            case TokenType.LESS_EQUAL:
+                def less_equal(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    if l.__class__ is not float or r.__class__ is not float: return binary(operator, l, r, "Operands must be numbers.")
+                    return l <= r
+                return less_equal
+            case TokenType.EQUAL_EQUAL:
+                def equal(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    return (l is None and r is None) or (l is not None and l == r)
+                return equal
+            case TokenType.BANG_EQUAL:
+                def not_equal(env: Env) -> object:
+                    l = left(env)
+                    r = right(env)
+                    return not ((l is None and r is None) or (l is not None and l == r))
+                return not_equal
+            case _: # comma operator, evaluates both sides to nil like the tree-walker
+                def comma(env: Env) -> object:
+                    left(env)
+                    right(env)
+                    return None
+                return comma
+
+    def visit_Logical_Expr(self, expr: Logical) -> ExprFn:
+        left: ExprFn = self.compile_expr(expr.left)
+        right: ExprFn = self.compile_expr(expr.right)
+        if expr.operator.token_type == TokenType.OR:
+            def logical_or(env: Env) -> object:
+                value = left(env)
+                if value is None or value is False: return right(env)
+                return value
+            return logical_or
+        def logical_and(env: Env) -> object:
+            value = left(env)
+            if value is None or value is False: return value
+            return right(env)
+        return logical_and
+
+    def visit_Ternary_Expr(self, expr: Ternary) -> ExprFn:
+        condition: ExprFn = self.compile_expr(expr.condition)
+        if_true: ExprFn = self.compile_expr(expr.expr_if_true)
+        if_false: ExprFn = self.compile_expr(expr.expr_if_false)
+        def ternary(env: Env) -> object:
+            value = condition(env)
+            if value is None or value is False: return if_false(env)
+            return if_true(env)
+        return ternary
+
+    def visit_Call_Expr(self, expr: Call) -> ExprFn:
+        get: Optional[Get] = expr.callee if isinstance(expr.callee, Get) else None
+        callee_fn: ExprFn = self.compile_expr(expr.callee if get is None else get.obj)
+        argument_fns: tuple[ExprFn, ...] = tuple(self.compile_expr(a) for a in expr.arguments)
+        argc: int = len(argument_fns)
+        paren: Token = expr.paren
+        interpreter: Interpreter = self.interpreter
+        def call_any(env: Env) -> object:
+            callee = callee_fn(env)
+            if callee.__class__ is ClosureFunction: return call_closure(callee, env)
+            return call_other(callee, env)
+        def call_other(callee: object, env: Env) -> object:
+            arguments: list[object] = [argument(env) for argument in argument_fns]
+            if callee.__class__ is NativeFunction: # straight into python
+                if argc != callee.params: raise PyloxRuntimeError(paren, f"Expected {callee.params} arguments but got {argc}.")
+                try: return callee.function(*arguments)
+                except NativeError as error: raise PyloxRuntimeError(paren, str(error)) from None
+            if not isinstance(callee, LoxCallable): raise PyloxRuntimeError(paren, "Can only call functions and classes.")
+            if argc != callee.arity(): raise PyloxRuntimeError(paren, f"Expected {callee.arity()} arguments but got {argc}.")
+            try: return callee.call(interpreter, arguments)
+            except RecursionError: raise PyloxRuntimeError(paren, "Stack overflow.") from None
+            except NativeError as error: raise PyloxRuntimeError(paren, str(error)) from None
+        def call_closure(callee: ClosureFunction, env: Env) -> object:
+            arguments: list[object] = [callee.env]
+            for argument in argument_fns: arguments.append(argument(env))
+            if argc != callee.params: raise PyloxRuntimeError(paren, f"Expected {callee.params} arguments but got {argc}.")
+            try:
+                if callee.is_initializer: return callee.call(interpreter, arguments[1:])
+                completion = callee.body(arguments)
+            except RecursionError: raise PyloxRuntimeError(paren, "Stack overflow.") from None # the innermost Lox call reports it
+            if completion.__class__ is tuple: return completion[0]
+            return None
+        if get is None: return call_any
+
+        # obj.method(...), callee_fn evaluates obj and the method runs with 'this' bound directly, no bound function in between
+        get_property: Callable[[object], object] = self.property_getter(get.name, get.cache)
+        name: str = get.name.lexeme
+        cache: InlineCache = get.cache
+        def invoke(env: Env) -> object:
+            obj = callee_fn(env)
+            if obj.__class__ is LoxInstance:
+                shape = obj.shape
+                method = cache.target if cache.shape is shape else cache.lookup(shape, name)[1]
+                if method is not None and not method.is_getter:
+                    arguments: list[object] = [[method.env, obj]]
+                    for argument in argument_fns: arguments.append(argument(env))
+                    if argc != method.params: raise PyloxRuntimeError(paren, f"Expected {method.params} arguments but got {argc}.")
+                    try: completion = method.body(arguments)
+                    except RecursionError: raise PyloxRuntimeError(paren, "Stack overflow.") from None
+                    if method.is_initializer: return obj
+                    if completion.__class__ is tuple: return completion[0]
+                    return None
+            callee = get_property(obj)
+            if callee.__class__ is ClosureFunction: return call_closure(callee, env)
+            return call_other(callee, env)
+        return invoke
+
+    def visit_Get_Expr(self, expr: Get) -> ExprFn:
+        obj_fn: ExprFn = self.compile_expr(expr.obj)
+        get_property: Callable[[object], object] = self.property_getter(expr.name, expr.cache)
+        def get(env: Env) -> object: return get_property(obj_fn(env))
+        return get
+
+    def property_getter(self, name: Token, cache: InlineCache) -> Callable[[object], object]:
+        interpreter: Interpreter = self.interpreter
+        def get_property(obj: object) -> object:
+            if obj.__class__ is LoxInstance and cache.shape is obj.shape: # monomorphic hit, fields and getters need no bound function
+                if cache.index >= 0: return obj.values[cache.index]
+                method = cache.target
+                if method is not None and method.is_getter: return method.call_bound(obj, [])
+            if not isinstance(obj, LoxInstance): raise PyloxRuntimeError(name, "Only instances have properties.")
+            value = obj.get(name, cache)
+            if value.__class__ is ClosureFunction and value.is_getter: return value.call(interpreter, [])
+            return value
+        return get_property
+
+    def visit_Set_Expr(self, expr: Set) -> ExprFn:
+        obj_fn: ExprFn = self.compile_expr(expr.obj)
+        value_fn: ExprFn = self.compile_expr(expr.value)
+        name: Token = expr.name
+        cache: SetCache = SetCache()
+        def set(env: Env) -> object:
+            obj = obj_fn(env)
+            if not isinstance(obj, LoxInstance): raise PyloxRuntimeError(name, "Only instances have fields.")
+            value = value_fn(env)
+            obj.set(name, value, cache)
+            return value
+        return set
+
+    def visit_Index_Expr(self, expr: Index) -> ExprFn:
+        obj_fn: ExprFn = self.compile_expr(expr.obj)
+        index_fn: ExprFn = self.compile_expr(expr.index)
+        bracket: Token = expr.bracket
+        def index(env: Env) -> object:
+            obj = obj_fn(env)
+            index = index_fn(env)
+            if not isinstance(obj, NativeInstance): raise PyloxRuntimeError(bracket, "Only lists and maps can be indexed.")
+            try: return obj.index_get(index)
+            except NativeError as error: raise PyloxRuntimeError(bracket, str(error)) from None
+        return index
+
+    def visit_SetIndex_Expr(self, expr: SetIndex) -> ExprFn:
+        obj_fn: ExprFn = self.compile_expr(expr.obj)
+        index_fn: ExprFn = self.compile_expr(expr.index)
+        value_fn: ExprFn = self.compile_expr(expr.value)
+        bracket: Token = expr.bracket
+        def set_index(env: Env) -> object:
+            obj = obj_fn(env)
+            index = index_fn(env)
+            value = value_fn(env)
+            if not isinstance(obj, NativeInstance): raise PyloxRuntimeError(bracket, "Only lists and maps can be indexed.")
+            try: obj.index_set(index, value)
+            except NativeError as error: raise PyloxRuntimeError(bracket, str(error)) from None
+            return value
+        return set_index
+
+    def visit_This_Expr(self, expr: This) -> ExprFn:
+        return self.getter(expr, expr.keyword)
+
+    def visit_Super_Expr(self, expr: Super) -> ExprFn:
+        this_depth: int = self.runtime_depth(expr.slot.depth) - 1 # 'this' sits right below the environment holding the superclasses
+        slot: int = expr.slot.idx + 1
+        method_name: Token = expr.method
+        def super_(env: Env) -> object:
+            for _ in range(this_depth): env = env[0]
+            instance: LoxInstance = env[1]
+            for sc in env[0][slot]:
+                if (method := sc.find_method(method_name.lexeme)) is not None: return method.bind(instance)
+            raise PyloxRuntimeError(method_name, f"Undefined property '{method_name.lexeme}'.")
+        return super_
+
+    def visit_Inner_Expr(self, expr: Inner) -> ExprFn:
+        depth: int = self.runtime_depth(expr.slot.depth)
+        method_name: Token = expr.method
+        def inner(env: Env) -> object:
+            for _ in range(depth): env = env[0]
+            instance: LoxInstance = env[1]
+            method = instance.klass.find_method(method_name.lexeme, ignore_first=True)
+            if method is None: raise PyloxRuntimeError(method_name, f"Undefined property '{method_name.lexeme}'.")
+            return method.bind(instance)
+        return inner
+
+    def visit_Variable_Expr(self, expr: Variable) -> ExprFn:
+        return self.getter(expr, expr.name)
+
+    def visit_Assign_Expr(self, expr: Assign) -> ExprFn:
+        return self.setter(expr, self.compile_expr(expr.value))
+
+    def visit_Lambda_Expr(self, expr: Lambda) -> ExprFn:
+        return self.function(expr, None, False, False)
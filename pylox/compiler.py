@@ -0,0 +1,318 @@
+from __future__ import annotations
+from typing import Optional
+from pylox.interpreter import Interpreter
+from pylox.expr import Expr, Literal, Grouping, Unary, Binary, Ternary, Variable, Assign, Logical, Call, Lambda, Get, Set, This, Super, Inner, Index, SetIndex
+from pylox.stmt import Stmt, Expression, Print, Var, Block, If, While, Break, Function, Return, Class
+from pylox.tokens import Token
+from pylox.tokentype import TokenType
+from pylox.environment import UnInitValue
+from pylox.chunk import OpCode, Chunk, FunctionProto, ClassProto
+from pylox.inline_cache import InlineCache, SetCache
+
+BINARY_OPS: dict[TokenType, OpCode] = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+}
+
+# superinstructions for the `i + 1`, `n - 1` and `i < n` shapes that dominate loops and recursion
+CONSTANT_OPS: dict[TokenType, OpCode] = {
+    TokenType.PLUS: OpCode.ADD_CONSTANT,
+    TokenType.MINUS: OpCode.SUBTRACT_CONSTANT,
+    TokenType.LESS: OpCode.LESS_CONSTANT,
+}
+
+class Compiler:
+    """Compiles resolved Stmt/Expr trees into bytecode for the VM.
+
+    Runtime environments follow the tree-walker's (a block or a call opens one, a bound method and a
+    class with superclasses add one each), except for blocks that declare nothing: those get no
+    environment and the resolver's depths are shifted past them at compile time.
+    """
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.function: FunctionProto = FunctionProto(None, 0)
+        self.function_depth: int = 0
+        self.env_depth: int = 0 # environments opened by blocks since the start of the current function
+        self.loops: list[tuple[int, list[int]]] = [] # (env_depth at loop start, offsets of break jumps to patch)
+        self.scopes: list[bool] = [] # one entry per resolver scope, innermost last, True if it has a runtime environment
+
+    @property
+    def chunk(self) -> Chunk:
+        return self.function.chunk
+
+    def compile(self, statements: list[Stmt]) -> FunctionProto:
+        for statement in statements: self.compile_stmt(statement)
+        self.chunk.write(OpCode.NIL)
+        self.chunk.write(OpCode.RETURN)
+        return self.function
+
+    def compile_expression(self, expr: Expr) -> FunctionProto:
+        self.compile_expr(expr)
+        self.chunk.write(OpCode.RETURN)
+        return self.function
+
+    def compile_stmt(self, stmt: Optional[Stmt]) -> None:
+        if stmt is not None: stmt.accept(self)
+
+    def compile_expr(self, expr: Expr) -> None:
+        expr.accept(self)
+
+    def is_global_scope(self) -> bool:
+        return self.function_depth == 0 and self.env_depth == 0
+
+    def emit_constant(self, value: object) -> None:
+        self.chunk.write(OpCode.CONSTANT, self.chunk.add_constant(value))
+
+    def emit_jump(self, op: OpCode) -> int:
+        offset: int = self.chunk.write(op, -1)
+        return offset + 1 # position of the operand to patch
+
+    def patch_jump(self, operand: int) -> None:
+        self.chunk.code[operand] = len(self.chunk.code)
+
+    def emit_define(self, name: Token) -> None:
+        if self.is_global_scope(): self.chunk.write(OpCode.DEFINE_GLOBAL, self.chunk.add_constant(name.lexeme))
+        else: self.chunk.write(OpCode.DEFINE_LOCAL)
+
+    def runtime_depth(self, depth: int) -> int:
+        if depth == 0: return 0
+        return sum(self.scopes[-depth:]) # skip the scopes that have no runtime environment
+
+    def emit_get(self, expr: This | Variable, name: Token) -> None:
+        if expr.slot.depth is None:
+            self.chunk.write(OpCode.GET_GLOBAL, self.chunk.add_constant(name.lexeme), token=name)
+            return
+        depth, unique_idx = self.runtime_depth(expr.slot.depth), expr.slot.idx
+        if depth == 0: self.chunk.write(OpCode.GET_LOCAL0, unique_idx)
+        elif depth == 1: self.chunk.write(OpCode.GET_LOCAL1, unique_idx)
+        else: self.chunk.write(OpCode.GET_LOCAL, depth, unique_idx)
+
+    def emit_set(self, expr: Assign, name: Token) -> None:
+        if expr.slot.depth is None: self.chunk.write(OpCode.SET_GLOBAL, self.chunk.add_constant(name.lexeme), token=name)
+        else: self.chunk.write(OpCode.SET_LOCAL, self.runtime_depth(expr.slot.depth), expr.slot.idx)
+
+    def function_proto(self, declaration: Function | Lambda, name: Optional[Token], is_initializer: bool, is_getter: bool) -> FunctionProto:
+        enclosing: tuple[FunctionProto, int, list] = (self.function, self.env_depth, self.loops)
+        self.function, self.env_depth, self.loops = FunctionProto(name, len(declaration.params), is_initializer, is_getter), 0, []
+        self.function_depth += 1
+        self.scopes.append(True)
+        for statement in declaration.body: self.compile_stmt(statement)
+        self.scopes.pop()
+        if is_initializer: self.chunk.write(OpCode.RETURN_THIS)
+        else:
+            self.chunk.write(OpCode.NIL)
+            self.chunk.write(OpCode.RETURN)
+        proto: FunctionProto = self.function
+        self.function_depth -= 1
+        self.function, self.env_depth, self.loops = enclosing
+        return proto
+
+    def visit_Block_Stmt(self, stmt: Block) -> None:
+        if not any(isinstance(statement, (Var, Function, Class)) for statement in stmt.statements):
+            self.scopes.append(False)
+            for statement in stmt.statements: self.compile_stmt(statement)
+            self.scopes.pop()
+            return
+        self.chunk.write(OpCode.PUSH_ENV)
+        self.env_depth += 1
+        self.scopes.append(True)
+        for statement in stmt.statements: self.compile_stmt(statement)
+        self.scopes.pop()
+        self.env_depth -= 1
+        self.chunk.write(OpCode.POP_ENV)
+
+    def visit_Class_Stmt(self, stmt: Class) -> None:
+        if stmt.superclasses:
+            for superclass in stmt.superclasses: self.compile_expr(superclass)
+            self.chunk.write(OpCode.INHERIT, len(stmt.superclasses), token=stmt.superclasses[0].name)
+            self.chunk.write(OpCode.PUSH_ENV) # holds the runtime list[LoxClass] of superclasses, like the tree-walker
+            self.env_depth += 1
+            self.scopes.append(True)
+            self.chunk.write(OpCode.DEFINE_LOCAL)
+        self.scopes.append(True) # 'this', created when a method gets bound
+        for method in stmt.methods:
+            proto: FunctionProto = self.function_proto(method, method.name, method.name.lexeme == "init", method.is_getter)
+            self.chunk.write(OpCode.CLOSURE, self.chunk.add_constant(proto))
+        for class_method in stmt.class_methods:
+            proto = self.function_proto(class_method, class_method.name, False, class_method.is_getter)
+            self.chunk.write(OpCode.CLOSURE, self.chunk.add_constant(proto))
+        class_proto: ClassProto = ClassProto(stmt.name, [m.name.lexeme for m in stmt.methods], [m.name.lexeme for m in stmt.class_methods], bool(stmt.superclasses))
+        self.chunk.write(OpCode.CLASS, self.chunk.add_constant(class_proto), token=stmt.name)
+        self.scopes.pop()
+        if stmt.superclasses:
+            self.scopes.pop()
+            self.env_depth -= 1
+            self.chunk.write(OpCode.POP_ENV)
+        # defining the name only once the class exists is equivalent to the tree-walker's define(None) then assign,
+        # methods can't run before this point and nothing else is defined in this environment in between
+        self.emit_define(stmt.name)
+
+    def visit_Expression_Stmt(self, stmt: Expression) -> None:
+        if isinstance(stmt.expression, Assign): # the assigned value isn't needed, store it without leaving a copy to pop
+            expr: Assign = stmt.expression
+            self.compile_expr(expr.value)
+            if expr.slot.depth is None: self.chunk.write(OpCode.STORE_GLOBAL, self.chunk.add_constant(expr.name.lexeme), token=expr.name)
+            else: self.chunk.write(OpCode.STORE_LOCAL, self.runtime_depth(expr.slot.depth), expr.slot.idx)
+            return
+        self.compile_expr(stmt.expression)
+        self.chunk.write(OpCode.POP)
+
+    def visit_Function_Stmt(self, stmt: Function) -> None:
+        proto: FunctionProto = self.function_proto(stmt, stmt.name, False, stmt.is_getter)
+        self.chunk.write(OpCode.CLOSURE, self.chunk.add_constant(proto))
+        self.emit_define(stmt.name)
+
+    def visit_If_Stmt(self, stmt: If) -> None:
+        self.compile_expr(stmt.condition)
+        else_jump: int = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.compile_stmt(stmt.then_branch)
+        if stmt.else_branch is None:
+            self.patch_jump(else_jump)
+            return
+        end_jump: int = self.emit_jump(OpCode.JUMP)
+        self.patch_jump(else_jump)
+        self.compile_stmt(stmt.else_branch)
+        self.patch_jump(end_jump)
+
+    def visit_Print_Stmt(self, stmt: Print) -> None:
+        self.compile_expr(stmt.expression)
+        self.chunk.write(OpCode.PRINT)
+
+    def visit_Return_Stmt(self, stmt: Return) -> None:
+        if self.function.is_initializer:
+            self.chunk.write(OpCode.RETURN_THIS)
+            return
+        if stmt.value is None: self.chunk.write(OpCode.NIL)
+        else: self.compile_expr(stmt.value)
+        self.chunk.write(OpCode.RETURN)
+
+    def visit_Var_Stmt(self, stmt: Var) -> None:
+        if isinstance(stmt.initializer, UnInitValue): self.emit_constant(stmt.initializer)
+        else: self.compile_expr(stmt.initializer)
+        self.emit_define(stmt.name)
+
+    def visit_While_Stmt(self, stmt: While) -> None:
+        loop_start: int = len(self.chunk.code)
+        self.compile_expr(stmt.condition)
+        exit_jump: int = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.loops.append((self.env_depth, []))
+        self.compile_stmt(stmt.body)
+        self.chunk.write(OpCode.JUMP, loop_start)
+        self.patch_jump(exit_jump)
+        for break_jump in self.loops.pop()[1]: self.patch_jump(break_jump)
+
+    def visit_Break_Stmt(self, stmt: Break) -> None:
+        if not self.loops: return # the parser only allows 'break' inside loops, a loop in an enclosing function can't be broken from here
+        loop_env_depth, break_jumps = self.loops[-1]
+        for _ in range(self.env_depth - loop_env_depth): self.chunk.write(OpCode.POP_ENV)
+        break_jumps.append(self.emit_jump(OpCode.JUMP))
+
+    def visit_Literal_Expr(self, expr: Literal) -> None:
+        if expr.value is None: self.chunk.write(OpCode.NIL)
+        elif expr.value is True: self.chunk.write(OpCode.TRUE)
+        elif expr.value is False: self.chunk.write(OpCode.FALSE)
+        else: self.emit_constant(expr.value)
+
+    def visit_Grouping_Expr(self, expr: Grouping) -> None:
+        self.compile_expr(expr.expression)
+
+    def visit_Unary_Expr(self, expr: Unary) -> None:
+        self.compile_expr(expr.right)
+        match expr.operator.token_type:
+            case TokenType.MINUS: self.chunk.write(OpCode.NEGATE, token=expr.operator)
+            case TokenType.BANG: self.chunk.write(OpCode.NOT)
+            case _:
+                self.chunk.write(OpCode.POP)
+                self.chunk.write(OpCode.NIL)
+
+    def visit_Binary_Expr(self, expr: Binary) -> None:
+        self.compile_expr(expr.left)
+        if expr.operator.token_type not in BINARY_OPS: # comma operator, evaluates both sides to nil like the tree-walker
+            self.chunk.write(OpCode.POP)
+            self.compile_expr(expr.right)
+            self.chunk.write(OpCode.POP)
+            self.chunk.write(OpCode.NIL)
+            return
+        if isinstance(expr.right, Literal) and isinstance(expr.right.value, float) and expr.operator.token_type in CONSTANT_OPS:
+            self.chunk.write(CONSTANT_OPS[expr.operator.token_type], self.chunk.add_constant(expr.right.value), token=expr.operator)
+            return
+        self.compile_expr(expr.right)
+        self.chunk.write(BINARY_OPS[expr.operator.token_type], token=expr.operator)
+
+    def visit_Logical_Expr(self, expr: Logical) -> None:
+        self.compile_expr(expr.left)
+        end_jump: int = self.emit_jump(OpCode.JUMP_IF_TRUE_KEEP if expr.operator.token_type == TokenType.OR else OpCode.JUMP_IF_FALSE_KEEP)
+        self.chunk.write(OpCode.POP)
+        self.compile_expr(expr.right)
+        self.patch_jump(end_jump)
+
+    def visit_Ternary_Expr(self, expr: Ternary) -> None:
+        self.compile_expr(expr.condition)
+        false_jump: int = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.compile_expr(expr.expr_if_true)
+        end_jump: int = self.emit_jump(OpCode.JUMP)
+        self.patch_jump(false_jump)
+        self.compile_expr(expr.expr_if_false)
+        self.patch_jump(end_jump)
+
+    def visit_Call_Expr(self, expr: Call) -> None:
+        if isinstance(expr.callee, Get): # GET_METHOD skips the GET_PROPERTY when it finds a method to call with obj as 'this'
+            self.compile_expr(expr.callee.obj)
+            self.chunk.write(OpCode.GET_METHOD)
+            self.visit_Get_Expr(expr.callee, compile_obj=False)
+            for argument in expr.arguments: self.compile_expr(argument)
+            self.chunk.write(OpCode.CALL_METHOD, len(expr.arguments), token=expr.paren)
+            return
+        self.compile_expr(expr.callee)
+        for argument in expr.arguments: self.compile_expr(argument)
+        self.chunk.write(OpCode.CALL, len(expr.arguments), token=expr.paren)
+
+    def visit_Get_Expr(self, expr: Get, compile_obj: bool = True) -> None:
+        if compile_obj: self.compile_expr(expr.obj)
+        self.chunk.write(OpCode.GET_PROPERTY, self.chunk.add_constant(expr.name), self.chunk.add_constant(InlineCache()), token=expr.name)
+
+    def visit_Set_Expr(self, expr: Set) -> None:
+        self.compile_expr(expr.obj)
+        if not isinstance(expr.value, (Literal, Variable, This)): # the tree-walker rejects non instances before evaluating the value
+            self.chunk.write(OpCode.CHECK_INSTANCE, token=expr.name)
+        self.compile_expr(expr.value)
+        self.chunk.write(OpCode.SET_PROPERTY, self.chunk.add_constant(expr.name), self.chunk.add_constant(SetCache()), token=expr.name)
+
+    def visit_Index_Expr(self, expr: Index) -> None:
+        self.compile_expr(expr.obj)
+        self.compile_expr(expr.index)
+        self.chunk.write(OpCode.GET_INDEX, token=expr.bracket)
+
+    def visit_SetIndex_Expr(self, expr: SetIndex) -> None:
+        self.compile_expr(expr.obj)
+        self.compile_expr(expr.index)
+        self.compile_expr(expr.value)
+        self.chunk.write(OpCode.SET_INDEX, token=expr.bracket)
+
+    def visit_This_Expr(self, expr: This) -> None:
+        self.emit_get(expr, expr.keyword)
+
+    def visit_Super_Expr(self, expr: Super) -> None:
+        self.chunk.write(OpCode.GET_SUPER, self.runtime_depth(expr.slot.depth), expr.slot.idx, self.chunk.add_constant(expr.method), token=expr.method)
+
+    def visit_Inner_Expr(self, expr: Inner) -> None:
+        self.chunk.write(OpCode.GET_INNER, self.runtime_depth(expr.slot.depth), self.chunk.add_constant(expr.method), token=expr.method)
+
+    def visit_Variable_Expr(self, expr: Variable) -> None:
+        self.emit_get(expr, expr.name)
+
+    def visit_Assign_Expr(self, expr: Assign) -> None:
+        self.compile_expr(expr.value)
+        self.emit_set(expr, expr.name)
+
+    def visit_Lambda_Expr(self, expr: Lambda) -> None:
+        proto: FunctionProto = self.function_proto(expr, None, False, False)
+        self.chunk.write(OpCode.CLOSURE, self.chunk.add_constant(proto))
@@ -1,7 +1,19 @@
-class ReturnSignal(Exception): # exception for signalling return stmt in a function
-    def __init__(self, value):
-        super().__init__()
-        self.value = value
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
 
-class BreakSignal(Exception): # exception for signalling break stmt in a loop
-    pass
\ No newline at end of file
+if TYPE_CHECKING:
+    from pylox.lox_function import LoxFunction
+    from pylox.lox_instance import LoxInstance
+
+# Statements signal how they completed through their return value instead of raising: None to carry on, BREAK
+# out of the innermost loop, a 1-tuple holding the value of a return, or a TailCall for a return of a call to
+# a Lox function. Exceptions are left to runtime errors.
+BREAK: object = object()
+
+class TailCall: # `return f(...)`, the returning function's LoxFunction.run loop makes the call in its place
+    __slots__ = ("function", "this", "arguments")
+
+    def __init__(self, function: LoxFunction, this: Optional[LoxInstance], arguments: list[object]):
+        self.function = function
+        self.this = this
+        self.arguments = arguments
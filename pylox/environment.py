@@ -25,10 +25,14 @@ class Environment:
         return environment
     
     def get_at(self, distance: int, name: str, idx: int) -> object:
+        if distance == 0: return self.__values[idx]
+        if distance == 1: return self.enclosing.__values[idx]
         return self.ancestor(distance).__values[idx]
 
     def assign_at(self, distance: int, idx: int, value: object) -> None:
-        self.ancestor(distance).__values[idx] = value
+        if distance == 0: self.__values[idx] = value
+        elif distance == 1: self.enclosing.__values[idx] = value
+        else: self.ancestor(distance).__values[idx] = value
     
     def assign(self, name: Token, value: object, idx: int) -> None:
         if idx < len(self.__values):
@@ -40,3 +44,53 @@ class Environment:
 @dataclass    
 class UnInitValue:
     pass
+
+
+# Where the tree-walker keeps a resolved variable (Slot.kind): globals stay in Interpreter.globals, locals in
+# the current function's frame, captured locals in a Cell in that frame, and variables of enclosing functions
+# in the Cells the closure captured when it was created (its upvalues).
+GLOBAL: int = 0
+LOCAL: int = 1
+CELL: int = 2
+UPVALUE: int = 3
+
+class Slot: # resolver annotation carried by every variable-like expression node and every declaration
+    __slots__ = ("depth", "idx", "kind", "index")
+
+    def __init__(self):
+        self.depth: Optional[int] = None # environment distance and index used by the VM and closure engines, depth is None for globals
+        self.idx: int = 0
+        self.kind: int = GLOBAL # frame slot used by the tree-walker
+        self.index: int = 0
+
+class Cell: # box for a local that a closure captures, shared by the frame and every closure holding it
+    __slots__ = ("value",)
+
+    def __init__(self, value: object = None):
+        self.value = value
+
+class LocalInfo: # escape analysis result for one frame slot, what any backend needs to decide between a plain slot and a cell
+    __slots__ = ("name", "line", "captured")
+
+    def __init__(self, name: str, line: int):
+        self.name = name
+        self.line = line
+        self.captured: bool = False # a nested function or lambda uses it, so it has to outlive or be shared beyond its frame
+
+class FrameLayout: # what the resolver worked out about one function's frame, carried by Function and Lambda nodes
+    __slots__ = ("size", "params_at", "cells", "upvalues", "locals")
+
+    def __init__(self):
+        self.size: int = 0 # slots in one activation, parameters and every local of every block in the body
+        self.params_at: int = 0 # 1 for methods, slot 0 holds 'this'
+        self.cells: list[int] = [] # parameter (or 'this') slots boxed on entry because a closure captures them
+        self.upvalues: list[tuple[bool, int]] = [] # per captured variable: (in the enclosing frame, slot or enclosing upvalue index)
+        self.locals: list[LocalInfo] = [] # per slot, in slot order
+
+    def allocate(self, name: str, line: int) -> int:
+        self.locals.append(LocalInfo(name, line))
+        self.size += 1
+        return self.size - 1
+
+    def captured(self) -> list[LocalInfo]:
+        return [info for info in self.locals if info.captured]
@@ -6,6 +6,7 @@ class ErrorReporter:
     had_error: bool = False
     had_runtime_error: bool = False
     had_warning: bool = False
+    warnings: list[str] = [] # every warning reported so far, kept so cached programs can replay them
 
     @classmethod
     def error(cls, message: str, **kwargs): # TODO: is there a cleaner way to do this?
@@ -20,7 +21,13 @@ class ErrorReporter:
 
     @classmethod
     def report_warning(cls, line: int, where: str, message: str):
-        print(f"[line {line}] Warning{where}: {message}")
+        warning: str = f"[line {line}] Warning{where}: {message}"
+        cls.warnings.append(warning)
+        cls.replay_warning(warning)
+
+    @classmethod
+    def replay_warning(cls, warning: str):
+        print(warning)
         cls.had_warning = True
 
     @classmethod
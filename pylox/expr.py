@@ -1,8 +1,10 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Protocol, Optional
 from pylox.tokens import Token
+from pylox.environment import Slot, FrameLayout
+from pylox.inline_cache import InlineCache, SetCache
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -13,11 +15,13 @@ class Visitor(Protocol):
 	def visit_Binary_Expr(self, binary: Binary): ...
 	def visit_Call_Expr(self, call: Call): ...
 	def visit_Get_Expr(self, get: Get): ...
+	def visit_Index_Expr(self, index: Index): ...
 	def visit_Lambda_Expr(self, lambda_arg: Lambda): ...
 	def visit_Grouping_Expr(self, grouping: Grouping): ...
 	def visit_Literal_Expr(self, literal: Literal): ...
 	def visit_Logical_Expr(self, logical: Logical): ...
 	def visit_Set_Expr(self, set: Set): ...
+	def visit_SetIndex_Expr(self, setindex: SetIndex): ...
 	def visit_Super_Expr(self, super: Super): ...
 	def visit_Inner_Expr(self, inner: Inner): ...
 	def visit_This_Expr(self, this: This): ...
@@ -26,27 +30,30 @@ class Visitor(Protocol):
 	def visit_Variable_Expr(self, variable: Variable): ...
 
 class Expr(ABC):
+	__slots__ = ()
 	@abstractmethod
 	def accept(self, visitor: Visitor): ...
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Assign(Expr):
 	name: Token
 	value: Expr
+	slot: Slot = field(default_factory=Slot)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Assign_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Binary(Expr):
 	left: Optional[Expr]
 	operator: Token
 	right: Optional[Expr]
+	float_op: object = None
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Binary_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Call(Expr):
 	callee: Expr
 	paren: Token
@@ -55,37 +62,48 @@ class Call(Expr):
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Call_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Get(Expr):
 	obj: Expr
 	name: Token
+	cache: InlineCache = field(default_factory=InlineCache)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Get_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
+class Index(Expr):
+	obj: Expr
+	bracket: Token
+	index: Expr
+
+	def accept(self, visitor: Visitor):
+		return visitor.visit_Index_Expr(self)
+
+@dataclass(eq=False, slots=True)
 class Lambda(Expr):
 	params: list[Token]
 	body: list[Stmt | None]
+	layout: FrameLayout = field(default_factory=FrameLayout)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Lambda_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Grouping(Expr):
 	expression: Expr
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Grouping_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Literal(Expr):
 	value: object
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Literal_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Logical(Expr):
 	left: Expr
 	operator: Token
@@ -94,39 +112,54 @@ class Logical(Expr):
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Logical_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Set(Expr):
 	obj: Expr
 	name: Token
 	value: Expr
+	cache: SetCache = field(default_factory=SetCache)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Set_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
+class SetIndex(Expr):
+	obj: Expr
+	bracket: Token
+	index: Expr
+	value: Expr
+
+	def accept(self, visitor: Visitor):
+		return visitor.visit_SetIndex_Expr(self)
+
+@dataclass(eq=False, slots=True)
 class Super(Expr):
 	keyword: Token
 	method: Token
+	slot: Slot = field(default_factory=Slot)
+	this_slot: Slot = field(default_factory=Slot)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Super_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Inner(Expr):
 	keyword: Token
 	method: Token
+	slot: Slot = field(default_factory=Slot)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Inner_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class This(Expr):
 	keyword: Token
+	slot: Slot = field(default_factory=Slot)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_This_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Unary(Expr):
 	operator: Token
 	right: Expr
@@ -134,7 +167,7 @@ class Unary(Expr):
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Unary_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Ternary(Expr):
 	condition: Expr
 	operator1: Token
@@ -145,9 +178,10 @@ class Ternary(Expr):
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Ternary_Expr(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Variable(Expr):
 	name: Token
+	slot: Slot = field(default_factory=Slot)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Variable_Expr(self)
\ No newline at end of file
@@ -0,0 +1,44 @@
+from __future__ import annotations
+from typing import Optional
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pylox.shape import Shape
+
+class ShapeCache:
+    """Per site cache of property lookups keyed on the receiver's Shape.
+
+    Monomorphic while a single shape shows up (kept inline, callers compare cache.shape themselves), polymorphic
+    up to MAX_ENTRIES shapes (a small dict), and megamorphic after that, where new shapes are resolved without
+    being cached. Shapes and class methods never change, so entries can't go stale.
+    """
+    __slots__ = ("shape", "index", "target", "entries")
+    MAX_ENTRIES: int = 4
+
+    def __init__(self):
+        self.shape: Optional[Shape] = None
+        self.index: int = -1
+        self.target: object = None
+        self.entries: Optional[dict[Shape, tuple[int, object]]] = None
+
+    def lookup(self, shape: Shape, name: str) -> tuple[int, object]:
+        entries = self.entries
+        if entries is not None and shape in entries: return entries[shape]
+        entry: tuple[int, object] = self.resolve(shape, name)
+        if self.shape is None: self.shape, (self.index, self.target) = shape, entry
+        elif entries is None: self.entries = {shape: entry}
+        elif len(entries) < self.MAX_ENTRIES: entries[shape] = entry
+        return entry
+
+    @staticmethod
+    def resolve(shape: Shape, name: str) -> tuple[int, object]: ...
+
+class InlineCache(ShapeCache): # property reads, caches the field index or else the method (target)
+    __slots__ = ()
+    @staticmethod
+    def resolve(shape: Shape, name: str) -> tuple[int, object]: return shape.resolve(name)
+
+class SetCache(ShapeCache): # field writes, caches the index written and the shape afterwards (target)
+    __slots__ = ()
+    @staticmethod
+    def resolve(shape: Shape, name: str) -> tuple[int, object]: return shape.store(name)
@@ -1,28 +1,54 @@
-from typing import cast, Optional
-from pylox.expr import Expr, Literal, Grouping, Unary, Binary, Ternary, Variable, Assign, Logical, Call, Lambda, Get, Set, This, Super, Inner
+import operator
+from typing import cast, Callable, Optional
+from pylox.expr import Expr, Literal, Grouping, Unary, Binary, Ternary, Variable, Assign, Logical, Call, Lambda, Get, Set, This, Super, Inner, Index, SetIndex
 from pylox.tokentype import TokenType
 from pylox.tokens import Token
-from pylox.runtime_error import PyloxRuntimeError
+from pylox.runtime_error import PyloxRuntimeError, NativeError
 from pylox.error import ErrorReporter
 from pylox.stmt import Stmt, Expression, Print, Var, Block, If, While, Break, Function, Return, Class
-from pylox.environment import Environment, UnInitValue
-from pylox.lox_callable import LoxCallable, Clock
+from pylox.environment import Environment, UnInitValue, Slot, Cell, FrameLayout, LOCAL, CELL, UPVALUE
+from pylox.lox_callable import LoxCallable
+from pylox import natives
+from pylox.natives import NativeFunction, NativeInstance, binary
 from pylox.lox_function import LoxFunction
+from pylox.rope import Rope, concat
 from pylox.lox_class import LoxClass
 from pylox.lox_instance import LoxInstance
-from pylox.control_flow_signal import ReturnSignal, BreakSignal
+from pylox.inline_cache import InlineCache
+from pylox.control_flow_signal import BREAK, TailCall
+
+# Binary.float_op records what a site has seen: None before its first run, the operator below while both operands
+# have always been numbers, False once anything else showed up. Float-only sites then skip the match and the checks.
+FLOAT_OPS: dict[TokenType, Callable[[float, float], object]] = {
+    TokenType.PLUS: operator.add, TokenType.MINUS: operator.sub, TokenType.STAR: operator.mul, TokenType.SLASH: operator.truediv,
+    TokenType.GREATER: operator.gt, TokenType.GREATER_EQUAL: operator.ge, TokenType.LESS: operator.lt, TokenType.LESS_EQUAL: operator.le,
+    TokenType.EQUAL_EQUAL: operator.eq, TokenType.BANG_EQUAL: operator.ne,
+}
 
 class Interpreter:
     globals: Environment = Environment()
-    __environment: Environment = globals 
-    locals: dict[Expr, tuple[int, int]] = {} # values are (depth, unique_idx)
     global_idxs: dict[str, int] = {} # key:value -> global_var_name:unique_idx
     global_var_count: int = 0
 
-    # globals.define("clock", Clock())
-    global_idxs["clock"] = global_var_count
-    global_var_count += 1
-    globals.define(Clock())
+    for name, native in natives.load().items(): # clock, memo and the default native modules
+        global_idxs[name] = global_var_count
+        global_var_count += 1
+        globals.define(native)
+
+    @classmethod
+    def load_natives(cls, modules: list[str]) -> None: # before an engine copies the globals
+        for name, native in natives.load(modules).items():
+            cls.global_idxs[name] = cls.global_var_count
+            cls.global_var_count += 1
+            cls.globals.define(native)
+
+    def __init__(self):
+        self.script_frame: list[object] = [] # locals of blocks in the top level code, sized by reserve_slots
+        self.frame: list[object] = self.script_frame # slots of the running function, see Slot.kind
+        self.upvalues: list[Cell] = [] # cells captured by the running function
+
+    def reserve_slots(self, size: int) -> None: # before running top level code the resolver laid out in `size` slots
+        if len(self.script_frame) < size: self.script_frame.extend([None] * (size - len(self.script_frame)))
 
     def interpret(self, statements: list[Stmt]):
         try:
@@ -31,49 +57,76 @@ class Interpreter:
                 self.execute(statement)
         except PyloxRuntimeError as error: ErrorReporter.runtime_error(error)
 
-    def execute(self, stmt: Stmt) -> None:
+    def execute(self, stmt: Stmt) -> object: # returns the statement's completion, see control_flow_signal
         # if stmt is None: return
-        stmt.accept(self)
+        return stmt.accept(self)
+
+    def resolve(self, expr: Assign | Super | Inner | This | Variable, depth: int, unique_idx: int) -> None:
+        expr.slot.depth, expr.slot.idx = depth, unique_idx
 
-    def resolve(self, expr: Expr, depth: int, unique_idx: int) -> None:
-        self.locals[expr] = (depth, unique_idx)
+    def execute_block(self, statements: list[Stmt | None]) -> object:
+        for statement in statements: 
+            if statement is not None and (completion := statement.accept(self)) is not None: return completion # break or return
+        return None
 
-    def execute_block(self, statements: list[Stmt | None], environment: Environment) -> None:
-        previous: Environment = self.__environment
+    def execute_frame(self, statements: list[Stmt | None], frame: list[object], upvalues: list[Cell]) -> object: # a function body
+        previous_frame, previous_upvalues = self.frame, self.upvalues
         try:
-            self.__environment = environment
+            self.frame, self.upvalues = frame, upvalues
             for statement in statements: 
-                if statement is not None: self.execute(statement)
-        finally: self.__environment = previous
+                if statement is not None and (completion := statement.accept(self)) is not None: return completion
+            return None
+        finally: self.frame, self.upvalues = previous_frame, previous_upvalues
 
-    def visit_Block_Stmt(self, stmt: Block) -> None:
-        self.execute_block(stmt.statements, Environment(self.__environment))
+    def visit_Block_Stmt(self, stmt: Block) -> object: # a block's locals already have their own slots in the frame
+        return self.execute_block(stmt.statements)
+
+    def closure_cells(self, layout: FrameLayout) -> list[Cell]: # upvalues of a function created in the running one
+        frame, upvalues = self.frame, self.upvalues
+        return [frame[i] if local else upvalues[i] for local, i in layout.upvalues]
+
+    def declare(self, name: Token, slot: Slot) -> None: # the declared variable's Cell, made before its value so closures in it can capture it
+        if slot.kind == CELL: self.frame[slot.index] = Cell(UnInitValue())
+
+    def define(self, name: Token, slot: Slot, value: object) -> None:
+        kind: int = slot.kind
+        if kind == LOCAL: self.frame[slot.index] = value
+        elif kind == CELL: self.frame[slot.index].value = value
+        else:
+            self.globals.define(value)
+            self.global_idxs[name.lexeme] = self.global_var_count
+            self.global_var_count += 1
+
+    def read_slot(self, slot: Slot) -> object: # a local, captured local or upvalue, any kind but GLOBAL
+        kind: int = slot.kind
+        if kind == LOCAL: return self.frame[slot.index]
+        if kind == CELL: return self.frame[slot.index].value
+        return self.upvalues[slot.index].value
 
     def visit_Class_Stmt(self, stmt: Class) -> None:
         superclasses: list[object] = []
         if stmt.superclasses:
             superclasses = [self.evaluate(sc) for sc in stmt.superclasses]
-            if not all([isinstance(sc, LoxClass) for sc in superclasses]): raise PyloxRuntimeError(stmt.superclass.name, "Superclass must be a class.")
-        self.global_idxs[stmt.name.lexeme] = self.global_var_count
-        self.global_var_count += 1
-        self.__environment.define(None)
+            if not all([isinstance(sc, LoxClass) for sc in superclasses]): raise PyloxRuntimeError(stmt.superclasses[0].name, "Superclass must be a class.")
+        self.declare(stmt.name, stmt.slot)
         if stmt.superclasses:
-            self.__environment = Environment(self.__environment)
-            self.__environment.define(superclasses) # this is runtime(list[LoxClass]) of super
+            self.declare(stmt.name, stmt.super_slot)
+            self.define(stmt.name, stmt.super_slot, superclasses) # this is runtime(list[LoxClass]) of super
         methods: dict[str, LoxFunction] = {}
         class_methods: dict[str, LoxFunction] = {}
         for method in stmt.methods:
-            function: LoxFunction = LoxFunction(method, self.__environment, method.name.lexeme == "init")
+            function: LoxFunction = LoxFunction(method, self.closure_cells(method.layout), method.name.lexeme == "init")
             methods[method.name.lexeme] = function
         for class_method in stmt.class_methods:
-            function: LoxFunction = LoxFunction(class_method, self.__environment, False)
+            function: LoxFunction = LoxFunction(class_method, self.closure_cells(class_method.layout), False)
             class_methods[class_method.name.lexeme] = function
         mro = []
         klass: LoxClass = LoxClass(stmt.name.lexeme, superclasses, methods, mro)
         klass.fields = class_methods
         klass.mro = self.mro(klass, stmt.name)
-        if superclasses: self.__environment = self.__environment.enclosing
-        self.__environment.assign(stmt.name, klass, self.global_idxs[stmt.name.lexeme])
+        klass.build_vtables()
+        # defined only now that the class exists, its methods can't run before this and nothing else gets defined in between
+        self.define(stmt.name, stmt.slot, klass)
 
     # C3 algorithm for MRO(method resolution order) similar to python
     # key rules:
@@ -136,13 +189,28 @@ class Interpreter:
         obj: object = self.evaluate(expr.obj)
         if not isinstance(obj, LoxInstance): raise PyloxRuntimeError(expr.name, "Only instances have fields.")
         value: object = self.evaluate(expr.value)
-        obj.set(expr.name, value)
+        obj.set(expr.name, value, expr.cache)
+        return value
+
+    def visit_Index_Expr(self, expr: Index) -> object:
+        obj: object = self.evaluate(expr.obj)
+        index: object = self.evaluate(expr.index)
+        if not isinstance(obj, NativeInstance): raise PyloxRuntimeError(expr.bracket, "Only lists and maps can be indexed.")
+        try: return obj.index_get(index)
+        except NativeError as error: raise PyloxRuntimeError(expr.bracket, str(error)) from None
+
+    def visit_SetIndex_Expr(self, expr: SetIndex) -> object:
+        obj: object = self.evaluate(expr.obj)
+        index: object = self.evaluate(expr.index)
+        value: object = self.evaluate(expr.value)
+        if not isinstance(obj, NativeInstance): raise PyloxRuntimeError(expr.bracket, "Only lists and maps can be indexed.")
+        try: obj.index_set(index, value)
+        except NativeError as error: raise PyloxRuntimeError(expr.bracket, str(error)) from None
         return value
     
     def visit_Super_Expr(self, expr: Super) -> object:
-        distance, unique_idx = self.locals.get(expr)
-        superclasses: list[LoxClass] = self.__environment.get_at(distance, "super", unique_idx)
-        object: LoxInstance = self.__environment.get_at(distance - 1, "this", idx=0) # 'this' will be at 0th index as created at resolving class stmt
+        superclasses: list[LoxClass] = self.read_slot(expr.slot)
+        object: LoxInstance = self.read_slot(expr.this_slot)
         method: Optional[LoxFunction] = None
         for sc in superclasses:
             if (loxfunc := sc.find_method(expr.method.lexeme)) is not None:
@@ -152,15 +220,14 @@ class Interpreter:
         return method.bind(object)
     
     def visit_Inner_Expr(self, expr: Inner) -> object:
-        distance, unique_idx = self.locals.get(expr)
-        object: LoxInstance = self.__environment.get_at(distance, "this", idx=0)
+        object: LoxInstance = self.read_slot(expr.slot)
         method: Optional[LoxFunction] = None
         if (loxfunc := object.klass.find_method(expr.method.lexeme, ignore_first=True)) is not None: method = loxfunc
         if method is None: raise PyloxRuntimeError(expr.method, f"Undefined property '{expr.method.lexeme}'.")
         return method.bind(object)
 
     def visit_This_Expr(self, expr: This) -> object:
-        return self.lookup_variable(expr.keyword, expr)
+        return self.read_slot(expr.slot)
     
     def visit_Grouping_Expr(self, expr: Grouping) -> object:
         return self.evaluate(expr.expression)
@@ -186,15 +253,24 @@ class Interpreter:
     def visit_Binary_Expr(self, expr: Binary) -> object:
         left: object = self.evaluate(expr.left)
         right: object = self.evaluate(expr.right)
+        float_op = expr.float_op
+        if float_op:
+            if left.__class__ is float and right.__class__ is float:
+                try: return float_op(left, right)
+                except ZeroDivisionError: pass # reported below
+            else: expr.float_op = False # the site saw another type, it stays generic
+        elif float_op is None: expr.float_op = FLOAT_OPS.get(expr.operator.token_type, False) if left.__class__ is float and right.__class__ is float else False
         match expr.operator.token_type:
+            case TokenType.MINUS | TokenType.SLASH | TokenType.STAR | TokenType.GREATER | TokenType.GREATER_EQUAL | TokenType.LESS | TokenType.LESS_EQUAL \
+                    if isinstance(left, NativeInstance) or isinstance(right, NativeInstance): # vectors and other natives with operators
+                return binary(expr.operator, left, right, "Operands must be numbers.")
             case TokenType.MINUS: 
                 self.check_number_operands(expr.operator, left, right)
                 return float(cast(float, left)) - float(cast(float, right))
             case TokenType.PLUS:
                 if isinstance(left, float) and isinstance(right, float): return float(left) + float(right)
-                if isinstance(left, str) or isinstance(right, str): 
-                    return (str(left)[:-2] if isinstance(left, float) else str(left)) + (str(right)[:-2] if isinstance(right, float) else str(right))
-                raise PyloxRuntimeError(expr.operator, "Operands must be numbers or strings.")
+                if isinstance(left, (str, Rope)) or isinstance(right, (str, Rope)): return concat(left, right)
+                return binary(expr.operator, left, right, "Operands must be numbers or strings.")
             case TokenType.SLASH: 
                 self.check_number_operands(expr.operator, left, right)
                 if float(cast(float, right)) == 0: raise PyloxRuntimeError(expr.operator, "Cannot divide by zero.")
@@ -218,20 +294,44 @@ class Interpreter:
             case TokenType.EQUAL_EQUAL: return self.is_equal(left, right) # can just use left != right here
             case _: return None
 
-    def visit_Call_Expr(self, expr: Call) -> object:
-        callee: object = self.evaluate(expr.callee)
-        arguments: list[object] = []
+    def visit_Call_Expr(self, expr: Call, tail: bool = False) -> object: # tail: a TailCall instead of calling a Lox function, see visit_Return_Stmt
+        if isinstance(expr.callee, Get): # obj.method(...), run the method with 'this' bound directly, no bound function in between
+            obj: object = self.evaluate(expr.callee.obj)
+            method: Optional[LoxFunction] = obj.get_method(expr.callee.name, expr.callee.cache) if obj.__class__ is LoxInstance else None
+            if method is not None and not method.declaration.is_getter:
+                arguments: list[object] = [self.evaluate(argument) for argument in expr.arguments]
+                if len(arguments) != method.arity(): raise PyloxRuntimeError(expr.paren, f"Expected {method.arity()} arguments but got {len(arguments)}.")
+                if tail: return TailCall(method, obj, arguments)
+                try: return method.call_bound(self, obj, arguments)
+                except RecursionError: raise PyloxRuntimeError(expr.paren, "Stack overflow.") from None # the innermost Lox call reports it
+            callee: object = self.get_property(obj, expr.callee)
+        else: callee = self.evaluate(expr.callee)
+        arguments = []
         for argument in expr.arguments: arguments.append(self.evaluate(argument))
+        if callee.__class__ is NativeFunction: # straight into python, no LoxCallable dispatch
+            if len(arguments) != callee.params: raise PyloxRuntimeError(expr.paren, f"Expected {callee.params} arguments but got {len(arguments)}.")
+            try: return callee.function(*arguments)
+            except NativeError as error: raise PyloxRuntimeError(expr.paren, str(error)) from None
         if not isinstance(callee, LoxCallable): raise PyloxRuntimeError(expr.paren, "Can only call functions and classes.")
         function: LoxCallable = callee
         if len(arguments) != function.arity(): raise PyloxRuntimeError(expr.paren, f"Expected {function.arity()} arguments but got {len(arguments)}.")
-        return function.call(self, arguments)
+        if tail and function.__class__ is LoxFunction: return TailCall(function, function.this, arguments)
+        try: return function.call(self, arguments)
+        except RecursionError: raise PyloxRuntimeError(expr.paren, "Stack overflow.") from None
+        except NativeError as error: raise PyloxRuntimeError(expr.paren, str(error)) from None
     
     def visit_Get_Expr(self, expr: Get) -> object:
-        obj: object = self.evaluate(expr.obj)
+        return self.get_property(self.evaluate(expr.obj), expr)
+
+    def get_property(self, obj: object, expr: Get) -> object:
+        cache: InlineCache = expr.cache
+        if obj.__class__ is LoxInstance and cache.shape is obj.shape: # monomorphic hit, fields and getters need no bound function
+            if cache.index >= 0: return obj.values[cache.index]
+            method: Optional[LoxFunction] = cache.target
+            if method is not None and method.declaration.is_getter: return method.call_bound(self, obj, [])
         if isinstance(obj, LoxInstance):
-            res = obj.get(expr.name)
-            if isinstance(res, LoxFunction) and res.declaration.is_getter: return res.call(self, [])
+            res = obj.get(expr.name, cache)
+            if isinstance(res, LoxFunction) and isinstance(res.declaration, Function) and res.declaration.is_getter: return res.call(self, [])
             return res
         raise PyloxRuntimeError(expr.name, "Only instances have properties.")
 
@@ -256,58 +356,68 @@ class Interpreter:
     def visit_Variable_Expr(self, expr: Variable) -> object: 
         return self.lookup_variable(expr.name, expr)
     
-    def lookup_variable(self, name: Token, expr: Expr) -> object:
-        distance, unique_idx = self.locals.get(expr) if self.locals.get(expr) else (None, None)
-        if distance is not None: return self.__environment.get_at(distance, name.lexeme, unique_idx)
+    def lookup_variable(self, name: Token, expr: Variable) -> object:
+        slot: Slot = expr.slot
+        kind: int = slot.kind
+        if kind == LOCAL: return self.frame[slot.index]
+        if kind == CELL: return self.frame[slot.index].value
+        if kind == UPVALUE: return self.upvalues[slot.index].value
+        if name.lexeme not in self.global_idxs: raise PyloxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
         return self.globals.get(name, self.global_idxs[name.lexeme])
     
     def visit_Expression_Stmt(self, stmt: Expression) -> None: self.evaluate(stmt.expression)
 
     def visit_Function_Stmt(self, stmt: Function) -> None:
-        function: LoxFunction = LoxFunction(stmt, self.__environment, False)
-        self.__environment.define(function)
-        if self.__environment.enclosing is None:
-            self.global_idxs[stmt.name.lexeme] = self.global_var_count
-            self.global_var_count += 1
+        self.declare(stmt.name, stmt.slot) # before the closure is made, a local function can call itself
+        self.define(stmt.name, stmt.slot, LoxFunction(stmt, self.closure_cells(stmt.layout), False))
 
-    def visit_If_Stmt(self, stmt: If) -> None:
-        if self.is_truthy(self.evaluate(stmt.condition)): self.execute(stmt.then_branch)
-        elif stmt.else_branch is not None: self.execute(stmt.else_branch)
+    def visit_If_Stmt(self, stmt: If) -> object:
+        if self.is_truthy(self.evaluate(stmt.condition)): return self.execute(stmt.then_branch)
+        if stmt.else_branch is not None: return self.execute(stmt.else_branch)
+        return None
     
     def visit_Print_Stmt(self, stmt: Print) -> None:
         value: object = self.evaluate(stmt.expression)
         print(self.stringify(value))
 
-    def visit_Return_Stmt(self, stmt: Return) -> None:
+    def visit_Return_Stmt(self, stmt: Return) -> tuple[object] | TailCall:
         value: object = None
-        if stmt.value is not None: value = self.evaluate(stmt.value)
-        raise ReturnSignal(value)
+        if stmt.value.__class__ is Call: # a call in tail position, the returning function's frame is reused for it
+            value = self.visit_Call_Expr(stmt.value, tail=True)
+            if value.__class__ is TailCall: return value
+        elif stmt.value is not None: value = self.evaluate(stmt.value)
+        return (value,)
 
     def visit_Var_Stmt(self, stmt: Var) -> None:
+        self.declare(stmt.name, stmt.slot)
         value: object | UnInitValue = UnInitValue()
         if not isinstance(stmt.initializer, UnInitValue): value = self.evaluate(stmt.initializer) 
-        self.__environment.define(value)
-        if self.__environment.enclosing is None:
-            self.global_idxs[stmt.name.lexeme] = self.global_var_count
-            self.global_var_count += 1
+        self.define(stmt.name, stmt.slot, value)
 
-    def visit_While_Stmt(self, stmt: While) -> None:
+    def visit_While_Stmt(self, stmt: While) -> object:
         while self.is_truthy(self.evaluate(stmt.condition)):
-            try: self.execute(stmt.body)
-            except BreakSignal: break # TODO: implement pylox break withhout using python break
+            completion: object = self.execute(stmt.body)
+            if completion is not None:
+                if completion is BREAK: return None
+                return completion # a return unwinding out of the loop
+        return None
 
-    def visit_Break_Stmt(self, stmt: Break) -> None:
-        raise BreakSignal
+    def visit_Break_Stmt(self, stmt: Break) -> object:
+        return BREAK
 
     def visit_Assign_Expr(self, expr: Assign) -> object:
         value: object = self.evaluate(expr.value)
         # self.__environment.assign(expr.name, value)
-        distance, unique_idx = self.locals.get(expr) if self.locals.get(expr) else (None, None)
-        if distance is not None: self.__environment.assign_at(distance, unique_idx, value)
+        slot: Slot = expr.slot
+        kind: int = slot.kind
+        if kind == LOCAL: self.frame[slot.index] = value
+        elif kind == CELL: self.frame[slot.index].value = value
+        elif kind == UPVALUE: self.upvalues[slot.index].value = value
+        elif expr.name.lexeme not in self.global_idxs: raise PyloxRuntimeError(expr.name, f"Undefined variable '{expr.name.lexeme}'.")
         else: self.globals.assign(expr.name, value, self.global_idxs[expr.name.lexeme])
         return value # assignment is an expression that can be nested inside other expressions
     
     def visit_Lambda_Expr(self, expr: Lambda) -> LoxFunction:
-        function: LoxFunction = LoxFunction(expr, self.__environment)
+        function: LoxFunction = LoxFunction(expr, self.closure_cells(expr.layout), False)
         return function
 
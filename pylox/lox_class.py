@@ -2,11 +2,15 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from pylox.lox_callable import LoxCallable
 from pylox.lox_instance import LoxInstance
+from pylox.shape import Shape
+from pylox.tokens import Token
+from pylox.runtime_error import PyloxRuntimeError
 from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from pylox.interpreter import Interpreter
     from pylox.lox_function import LoxFunction
+    from pylox.inline_cache import InlineCache, SetCache
 
 class LoxClass(LoxCallable, LoxInstance):
     def __init__(self, name: str, superclasses: list[LoxClass], methods: dict[str, LoxFunction], mro: list[LoxClass] = []):
@@ -14,23 +18,41 @@ class LoxClass(LoxCallable, LoxInstance):
         self.superclasses = superclasses
         self.methods = methods
         self.mro = mro
+        self.vtable: dict[str, LoxFunction] = {} # name -> method over the whole mro, filled by build_vtables
+        self.inner_vtable: dict[str, LoxFunction] = {} # the same without the root class, for inner()
+        self.initializer: Optional[LoxFunction] = None
+        self.root_shape: Shape = Shape(self, {}) # every instance starts here
+        self.fields: dict[str, object] = {} # class methods and fields set on the class itself, classes are few so no shapes
+
+    def build_vtables(self) -> None: # once the mro is known, a class's methods never change after that
+        vtable: dict[str, LoxFunction] = {}
+        inner_vtable: dict[str, LoxFunction] = {}
+        for i, sc in enumerate(reversed(self.mro)): # the root class's methods win, inner() defers to subclasses
+            for name, method in sc.methods.items():
+                vtable.setdefault(name, method)
+                if i: inner_vtable.setdefault(name, method)
+        self.vtable, self.inner_vtable, self.initializer = vtable, inner_vtable, vtable.get("init")
 
     def find_method(self, name: str, ignore_first: bool = False) -> Optional[LoxFunction]:
-        mro = self.mro[-1::-1]
-        if ignore_first: mro = mro[1:]
-        for sc in mro:
-            if name in sc.methods: return sc.methods[name]
+        return (self.inner_vtable if ignore_first else self.vtable).get(name)
 
     def call(self, interpreter: Interpreter, arguments: list[object]) -> object:
-        instance: LoxInstance = LoxInstance(klass=self, fields={})
-        initializer: LoxFunction = self.find_method("init")
+        instance: LoxInstance = LoxInstance(self)
+        initializer: Optional[LoxFunction] = self.initializer
         if initializer is not None: initializer.bind(instance).call(interpreter, arguments)
         return instance
     
     def arity(self) -> int:
-        initializer: LoxFunction = self.find_method("init")
+        initializer: Optional[LoxFunction] = self.initializer
         if initializer is None: return 0
         return initializer.arity()
 
+    def get(self, name: Token, cache: Optional[InlineCache] = None) -> object:
+        if name.lexeme in self.fields: return self.fields[name.lexeme]
+        raise PyloxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+
+    def set(self, name: Token, value: object, cache: Optional[SetCache] = None) -> None:
+        self.fields[name.lexeme] = value
+
     def __str__(self):
         return self.name + str(len(self.mro))
\ No newline at end of file
@@ -3,10 +3,10 @@ from dataclasses import dataclass
 from pylox.lox_callable import LoxCallable
 from pylox.stmt import Function
 from pylox.expr import Lambda
-from pylox.control_flow_signal import ReturnSignal
-from pylox.environment import Environment
+from pylox.environment import Cell, FrameLayout
 from pylox.lox_instance import LoxInstance
-from typing import TYPE_CHECKING
+from pylox.control_flow_signal import TailCall
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from pylox.interpreter import Interpreter
@@ -14,29 +14,38 @@ if TYPE_CHECKING:
 @dataclass(frozen=True)
 class LoxFunction(LoxCallable):
     declaration: Function | Lambda
-    closure: Environment
+    upvalues: list[Cell] # cells of the enclosing functions' variables this function uses, see FrameLayout.upvalues
     is_initializer: bool
+    this: Optional[LoxInstance] = None
 
     def bind(self, instance: LoxInstance) -> LoxFunction:
-        environment: Environment = Environment(self.closure)
-        environment.define(instance)
-        return LoxFunction(self.declaration, environment, self.is_initializer)
+        return LoxFunction(self.declaration, self.upvalues, self.is_initializer, instance)
 
     def call(self, interpreter: Interpreter, arguments: list[object]) -> object:
-        environment: Environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)): environment.define(arguments[i])
-        try: interpreter.execute_block(self.declaration.body, environment)
-        except ReturnSignal as r:
-            # case of init with empty return
-            if self.is_initializer: return self.closure.get_at(distance=0, name="this", idx=0) # 'this' will be at 0th index as created at resolving class stmt
-            return r.value
-        # case of init with no return
-        if self.is_initializer: return self.closure.get_at(distance=0, name="this", idx=0) # 'this' will be at 0th index as created at resolving class stmt
-        return None
+        return self.run(interpreter, self.this, arguments)
+
+    def call_bound(self, interpreter: Interpreter, instance: LoxInstance, arguments: list[object]) -> object: # bind(instance).call() without the bound function
+        return self.run(interpreter, instance, arguments)
+
+    def run(self, interpreter: Interpreter, this: Optional[LoxInstance], arguments: list[object]) -> object:
+        function: LoxFunction = self
+        while True: # once per tail call, the callee runs at the same python stack depth as its caller
+            layout: FrameLayout = function.declaration.layout
+            frame: list[object] = [this, *arguments] if layout.params_at else list(arguments)
+            if len(frame) < layout.size: frame.extend([None] * (layout.size - len(frame)))
+            for i in layout.cells: frame[i] = Cell(frame[i])
+            completion: object = interpreter.execute_frame(function.declaration.body, frame, function.upvalues)
+            if completion.__class__ is TailCall:
+                function, this, arguments = completion.function, completion.this, completion.arguments
+                continue
+            # init always returns this, with or without an empty return
+            if function.is_initializer: return this
+            if completion is not None: return completion[0] # the resolver keeps break inside loops, so this is a return
+            return None
     
     def arity(self) -> int:
         return len(self.declaration.params)
 
     def __str__(self) -> str: 
         if isinstance(self.declaration, Lambda): return "<lambda fn>"
-        return f"<fn {self.declaration.name.lexeme}>"
\ No newline at end of file
+        return f"<fn {self.declaration.name.lexeme}>"
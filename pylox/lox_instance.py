@@ -2,27 +2,52 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from pylox.tokens import Token
 from pylox.runtime_error import PyloxRuntimeError
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from pylox.lox_class import LoxClass
     from pylox.lox_function import LoxFunction
+    from pylox.inline_cache import InlineCache, SetCache
+    from pylox.shape import Shape
 
 class LoxInstance:
-    def __init__(self, klass: LoxClass, fields: dict[str, object]):
+    __slots__ = ("klass", "shape", "values") # field names live in the shared shape, only their values per instance
+
+    def __init__(self, klass: LoxClass):
         self.klass = klass
-        self.fields = fields
+        self.shape: Shape = klass.root_shape
+        self.values: list[object] = []
 
-    def get(self, name: Token) -> object:
-        if name.lexeme in self.fields: return self.fields[name.lexeme]
-        # print("instance find_methhod ----------------------------------------------------------")
-        method: LoxFunction = self.klass.find_method(name.lexeme)
-        # print("instance END -------------------------------------------------------------------")
+    def get(self, name: Token, cache: Optional[InlineCache] = None) -> object:
+        shape: Shape = self.shape
+        if cache is not None and cache.shape is shape: # monomorphic hit, the common case
+            if cache.index >= 0: return self.values[cache.index]
+            idx, method = -1, cache.target
+        elif cache is not None: idx, method = cache.lookup(shape, name.lexeme)
+        else: idx, method = shape.resolve(name.lexeme)
+        if idx >= 0: return self.values[idx]
         if method is not None: return method.bind(self)
         raise PyloxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
     
-    def set(self, name: Token, value: object) -> None:
-        self.fields[name.lexeme] = value
+    def get_method(self, name: Token, cache: InlineCache) -> object: # the unbound method get() would bind, None if a field shadows it or there is none
+        shape: Shape = self.shape
+        if cache.shape is shape: return cache.target
+        return cache.lookup(shape, name.lexeme)[1]
+
+    def set(self, name: Token, value: object, cache: Optional[SetCache] = None) -> None:
+        shape: Shape = self.shape
+        if cache is not None and cache.shape is shape:
+            next_shape = cache.target
+            if next_shape is shape: # monomorphic write to an existing field, the common case
+                self.values[cache.index] = value
+                return
+            idx = cache.index
+        elif cache is not None: idx, next_shape = cache.lookup(shape, name.lexeme)
+        else: idx, next_shape = shape.store(name.lexeme)
+        if next_shape is shape: self.values[idx] = value
+        else:
+            self.values.append(value)
+            self.shape = next_shape
 
     def __str__(self):
-        return self.klass.name + " instance"
\ No newline at end of file
+        return self.klass.name + " instance"
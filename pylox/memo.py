@@ -0,0 +1,83 @@
+from __future__ import annotations
+from collections import OrderedDict
+from pylox.lox_callable import LoxCallable
+from pylox.lox_instance import LoxInstance
+from pylox.tokens import Token
+from pylox.runtime_error import PyloxRuntimeError, NativeError
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from pylox.interpreter import Interpreter
+    from pylox.inline_cache import InlineCache, SetCache
+
+CAPACITY: int = 4096 # default number of results a memoized function keeps
+MISS: object = object() # lookup() result when nothing is cached, nil is a result like any other
+
+class Memo(LoxCallable): # memo(fn), native returning fn with its results cached
+    def arity(self) -> int: return 1
+
+    def call(self, interpreter: Interpreter, arguments: list[object]) -> object:
+        if not isinstance(arguments[0], LoxCallable): raise NativeError("memo() expects a function.")
+        return MemoizedFunction(arguments[0])
+
+    def __str__(self) -> str: return "<native fn>"
+
+class MemoizedFunction(LoxCallable, LoxInstance):
+    """A Lox callable caching the results of another, for pure functions only: a hit skips the call entirely.
+
+    Arguments are keyed by value for numbers, strings, booleans and nil and by identity for instances and
+    classes. A call with an argument that can't be a key (a function) just runs uncached. The least recently
+    used result is evicted past capacity. Lox reads hits, misses, size and capacity as properties and may set capacity.
+    """
+    def __init__(self, function: LoxCallable, capacity: int = CAPACITY):
+        self.function = function
+        self.capacity = capacity
+        self.results: OrderedDict[tuple, object] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def arity(self) -> int:
+        return self.function.arity()
+
+    def call(self, interpreter: Interpreter, arguments: list[object]) -> object:
+        key, value = self.lookup(arguments)
+        if value is MISS:
+            value = self.function.call(interpreter, arguments)
+            if key is not None: self.store(key, value)
+        return value
+
+    def lookup(self, arguments: list[object]) -> tuple[Optional[tuple], object]: # (key, cached value or MISS), key is None for arguments that can't be one
+        key: tuple = (tuple(arguments), tuple(map(type, arguments))) # 1 and true hash alike, their types keep them apart
+        try: value: object = self.results[key]
+        except KeyError: pass
+        except TypeError: # unhashable argument
+            self.misses += 1
+            return None, MISS
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return key, value
+        self.misses += 1
+        return key, MISS
+
+    def store(self, key: tuple, value: object) -> None:
+        results: OrderedDict[tuple, object] = self.results
+        results[key] = value
+        if len(results) > self.capacity: results.popitem(last=False)
+
+    def get(self, name: Token, cache: Optional[InlineCache] = None) -> object:
+        match name.lexeme:
+            case "hits": return float(self.hits)
+            case "misses": return float(self.misses)
+            case "size": return float(len(self.results))
+            case "capacity": return float(self.capacity)
+        raise PyloxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+
+    def set(self, name: Token, value: object, cache: Optional[SetCache] = None) -> None:
+        if name.lexeme != "capacity": raise PyloxRuntimeError(name, "Only capacity can be set on a memoized function.")
+        if not isinstance(value, float) or value < 1 or value != int(value): raise PyloxRuntimeError(name, "Capacity must be a positive integer.")
+        self.capacity = int(value)
+        while len(self.results) > self.capacity: self.results.popitem(last=False)
+
+    def __str__(self) -> str:
+        return f"<memo {self.function}>"
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import importlib
+from pylox.lox_callable import LoxCallable
+from pylox.lox_instance import LoxInstance
+from pylox.tokens import Token
+from pylox.tokentype import TokenType
+from pylox.runtime_error import PyloxRuntimeError, NativeError
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from pylox.interpreter import Interpreter
+    from pylox.inline_cache import InlineCache, SetCache
+
+# Registry of builtins implemented in python. A native module registers its functions on import with @native,
+# or register() for a LoxCallable of its own, and every engine sees them as globals. The default modules import
+# nothing heavier than the standard library at startup (vectors imports numpy on first use), more come from
+# --natives=<module>, where a name without a dot is one of the modules here and anything else is imported as given.
+
+DEFAULT_MODULES: tuple[str, ...] = ("pylox.natives.core", "pylox.natives.numeric", "pylox.natives.strings", "pylox.natives.containers", "pylox.natives.vectors")
+NATIVES: dict[str, LoxCallable] = {} # Lox global name -> native, everything registered so far
+
+class NativeFunction(LoxCallable): # a python function called with the Lox arguments, engines call function directly
+    __slots__ = ("name", "params", "function")
+
+    def __init__(self, name: str, params: int, function: Callable[..., object]):
+        self.name = name
+        self.params = params
+        self.function = function
+
+    def arity(self) -> int: return self.params
+    def call(self, interpreter: Interpreter, arguments: list[object]) -> object: return self.function(*arguments)
+    def __str__(self) -> str: return "<native fn>"
+
+class NativeInstance(LoxInstance):
+    """Instance of a class implemented in python. Lox sees the python methods listed in `methods` (Lox name ->
+    (arity, function)) as its methods, it has no fields of its own. Collections also override index_get and
+    index_set for `obj[index]`, raising NativeError like any native, and binary for arithmetic and comparisons.
+    """
+    __slots__ = ()
+    methods: dict[str, tuple[int, Callable[..., object]]] = {}
+
+    def get(self, name: Token, cache: Optional[InlineCache] = None) -> object:
+        method: Optional[tuple[int, Callable[..., object]]] = self.methods.get(name.lexeme)
+        if method is None: raise PyloxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+        return NativeFunction(name.lexeme, method[0], method[1].__get__(self))
+
+    def get_method(self, name: Token, cache: InlineCache) -> object: # no LoxFunction methods to call bound
+        return None
+
+    def set(self, name: Token, value: object, cache: Optional[SetCache] = None) -> None:
+        raise PyloxRuntimeError(name, f"Can't set properties on {self}.")
+
+    def index_get(self, index: object) -> object:
+        raise NativeError(f"Can't index {self}.")
+
+    def index_set(self, index: object, value: object) -> None:
+        raise NativeError(f"Can't index {self}.")
+
+    def binary(self, operator: TokenType, other: object, swapped: bool) -> object: # swapped: self is the right operand
+        return NotImplemented
+
+class NativeClass(LoxCallable): # calling it makes a NativeInstance
+    __slots__ = ("name", "params", "factory")
+
+    def __init__(self, name: str, params: int, factory: Callable[..., NativeInstance]):
+        self.name = name
+        self.params = params
+        self.factory = factory
+
+    def arity(self) -> int: return self.params
+    def call(self, interpreter: Interpreter, arguments: list[object]) -> object: return self.factory(*arguments)
+    def __str__(self) -> str: return self.name
+
+def binary(operator: Token, left: object, right: object, message: str) -> object: # operands an engine's number path rejected
+    result: object = NotImplemented
+    try:
+        if isinstance(left, NativeInstance): result = left.binary(operator.token_type, right, False)
+        if result is NotImplemented and isinstance(right, NativeInstance): result = right.binary(operator.token_type, left, True)
+    except NativeError as error: raise PyloxRuntimeError(operator, str(error)) from None
+    if result is NotImplemented: raise PyloxRuntimeError(operator, message)
+    return result
+
+def register(name: str, callable: LoxCallable) -> None:
+    NATIVES[name] = callable
+
+def native(name: str, arity: int) -> Callable[[Callable[..., object]], Callable[..., object]]: # decorator, the function raises NativeError on bad arguments
+    def register_function(function: Callable[..., object]) -> Callable[..., object]:
+        register(name, NativeFunction(name, arity, function))
+        return function
+    return register_function
+
+def native_class(name: str, arity: int) -> Callable[[type[NativeInstance]], type[NativeInstance]]: # decorator, arity of the constructor
+    def register_class(cls: type[NativeInstance]) -> type[NativeInstance]:
+        register(name, NativeClass(name, arity, cls))
+        return cls
+    return register_class
+
+def load(modules: tuple[str, ...] | list[str] = DEFAULT_MODULES) -> dict[str, LoxCallable]: # the natives these modules added
+    before: set[str] = set(NATIVES)
+    for module in modules: importlib.import_module(module if "." in module else f"{__name__}.{module}")
+    return {name: callable for name, callable in NATIVES.items() if name not in before}
@@ -0,0 +1,111 @@
+from __future__ import annotations
+from reprlib import recursive_repr
+from pylox.natives import native_class, NativeInstance
+from pylox.natives.strings import str_
+from pylox.runtime_error import NativeError
+from pylox.rope import Rope
+
+@native_class("List", 0)
+class LoxList(NativeInstance): # growable, a python list underneath so a[i] and append() are O(1)
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items: list[object] = []
+
+    def index_get(self, index: object) -> object:
+        items: list[object] = self.items
+        if index.__class__ is float and 0 <= index < len(items) and index.is_integer(): return items[int(index)]
+        raise NativeError(self.bad_index(index))
+
+    def index_set(self, index: object, value: object) -> None:
+        items: list[object] = self.items
+        if index.__class__ is float and 0 <= index < len(items) and index.is_integer(): items[int(index)] = value
+        else: raise NativeError(self.bad_index(index))
+
+    def bad_index(self, index: object) -> str:
+        if index.__class__ is not float or not index.is_integer(): return "List index must be an integer."
+        return "List index out of range."
+
+    def append(self, value: object) -> LoxList: # returns the list so appends chain
+        self.items.append(value)
+        return self
+
+    def pop(self) -> object:
+        if not self.items: raise NativeError("Can't pop from an empty list.")
+        return self.items.pop()
+
+    def length(self) -> float:
+        return float(len(self.items))
+
+    def clear(self) -> LoxList:
+        self.items.clear()
+        return self
+
+    @recursive_repr("[...]") # a list holding itself
+    def __str__(self) -> str:
+        return "[" + ", ".join(map(str_, self.items)) + "]"
+
+    methods = {"append": (1, append), "pop": (0, pop), "length": (0, length), "clear": (0, clear)}
+
+
+TRUE, FALSE = object(), object() # map keys standing in for true and false, which python hashes equal to 1 and 0
+
+def key(value: object, name: str) -> object:
+    cls: type = value.__class__
+    if cls is str or cls is float or value is None: return value
+    if value is True: return TRUE
+    if value is False: return FALSE
+    if cls is Rope: return str(value)
+    raise NativeError(f"{name} must be a string, number, boolean or nil.")
+
+def lox_key(value: object) -> object:
+    if value is TRUE: return True
+    if value is FALSE: return False
+    return value
+
+@native_class("Map", 0)
+class LoxMap(NativeInstance): # hash map keyed by Lox strings, numbers, booleans and nil, in insertion order
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries: dict[object, object] = {}
+
+    def index_get(self, index: object) -> object:
+        try: return self.entries[key(index, "Map key")]
+        except KeyError: raise NativeError(f"Undefined key '{str_(index)}'.") from None
+
+    def index_set(self, index: object, value: object) -> None:
+        self.entries[key(index, "Map key")] = value
+
+    def lookup(self, k: object) -> object: # nil when missing, m[k] is the strict version
+        return self.entries.get(key(k, "Map key"))
+
+    def put(self, k: object, value: object) -> LoxMap: # returns the map so puts chain
+        self.entries[key(k, "Map key")] = value
+        return self
+
+    def has(self, k: object) -> bool:
+        return key(k, "Map key") in self.entries
+
+    def delete(self, k: object) -> bool: # whether the key was there
+        return self.entries.pop(key(k, "Map key"), self) is not self
+
+    def size(self) -> float:
+        return float(len(self.entries))
+
+    def key_list(self) -> LoxList:
+        keys: LoxList = LoxList()
+        keys.items = list(map(lox_key, self.entries))
+        return keys
+
+    def value_list(self) -> LoxList:
+        values: LoxList = LoxList()
+        values.items = list(self.entries.values())
+        return values
+
+    @recursive_repr("{...}")
+    def __str__(self) -> str:
+        return "{" + ", ".join(f"{str_(lox_key(k))}: {str_(v)}" for k, v in self.entries.items()) + "}"
+
+    methods = {"get": (1, lookup), "put": (2, put), "has": (1, has), "delete": (1, delete), "size": (0, size),
+               "keys": (0, key_list), "values": (0, value_list)}
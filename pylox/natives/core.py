@@ -0,0 +1,6 @@
+from pylox.natives import register
+from pylox.lox_callable import Clock
+from pylox.memo import Memo
+
+register("clock", Clock())
+register("memo", Memo())
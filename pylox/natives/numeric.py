@@ -0,0 +1,48 @@
+import math
+from pylox.natives import native
+from pylox.runtime_error import NativeError
+
+def number(value: object, name: str) -> float:
+    if value.__class__ is not float: raise NativeError(f"{name}() expects a number.")
+    return value
+
+@native("sqrt", 1)
+def sqrt(x: object) -> float:
+    if number(x, "sqrt") < 0: raise NativeError("sqrt() of a negative number.")
+    return math.sqrt(x)
+
+@native("abs", 1)
+def abs_(x: object) -> float: return abs(number(x, "abs"))
+
+@native("floor", 1)
+def floor(x: object) -> float: return float(math.floor(number(x, "floor")))
+
+@native("ceil", 1)
+def ceil(x: object) -> float: return float(math.ceil(number(x, "ceil")))
+
+@native("min", 2)
+def min_(a: object, b: object) -> float: return min(number(a, "min"), number(b, "min"))
+
+@native("max", 2)
+def max_(a: object, b: object) -> float: return max(number(a, "max"), number(b, "max"))
+
+@native("pow", 2)
+def pow_(a: object, b: object) -> float:
+    try: return math.pow(number(a, "pow"), number(b, "pow"))
+    except (ValueError, OverflowError) as error: raise NativeError(f"pow() {error}.") from None
+
+@native("exp", 1)
+def exp(x: object) -> float:
+    try: return math.exp(number(x, "exp"))
+    except OverflowError: raise NativeError("exp() result too large.") from None
+
+@native("log", 1)
+def log(x: object) -> float:
+    if number(x, "log") <= 0: raise NativeError("log() of a non-positive number.")
+    return math.log(x)
+
+@native("sin", 1)
+def sin(x: object) -> float: return math.sin(number(x, "sin"))
+
+@native("cos", 1)
+def cos(x: object) -> float: return math.cos(number(x, "cos"))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+from pylox.natives import native, native_class, NativeInstance
+from pylox.runtime_error import NativeError
+from pylox.rope import Rope
+
+def string(value: object, name: str) -> str:
+    if value.__class__ is Rope: return str(value)
+    if value.__class__ is not str: raise NativeError(f"{name}() expects a string.")
+    return value
+
+def index(value: object, name: str) -> int:
+    if value.__class__ is not float or not value.is_integer(): raise NativeError(f"{name}() expects an integer index.")
+    return int(value)
+
+@native("len", 1)
+def len_(s: object) -> float: return float(len(string(s, "len")))
+
+@native("substr", 3)
+def substr(s: object, start: object, end: object) -> str: return string(s, "substr")[index(start, "substr"):index(end, "substr")]
+
+@native("upper", 1)
+def upper(s: object) -> str: return string(s, "upper").upper()
+
+@native("lower", 1)
+def lower(s: object) -> str: return string(s, "lower").lower()
+
+@native("indexof", 2)
+def indexof(s: object, part: object) -> float: return float(string(s, "indexof").find(string(part, "indexof")))
+
+@native("str", 1)
+def str_(value: object) -> str: # what print shows
+    if value is None: return "nil"
+    if value is True: return "true"
+    if value is False: return "false"
+    if value.__class__ is float:
+        text: str = str(value)
+        return text[:-2] if text[-2:] == ".0" else text
+    return str(value)
+
+@native("num", 1)
+def num(s: object) -> object: # nil when the string isn't a number
+    try: return float(string(s, "num"))
+    except ValueError: return None
+
+@native("chr", 1)
+def chr_(code: object) -> str:
+    try: return chr(index(code, "chr"))
+    except (ValueError, OverflowError): raise NativeError("chr() code out of range.") from None
+
+@native("ord", 1)
+def ord_(s: object) -> float:
+    if len(string(s, "ord")) != 1: raise NativeError("ord() expects a single character.")
+    return float(ord(s))
+
+@native_class("StringBuilder", 0)
+class StringBuilder(NativeInstance): # append() any number of values, then one join in toString()
+    __slots__ = ("parts", "length")
+
+    def __init__(self):
+        self.parts: list[str] = []
+        self.length: int = 0
+
+    def append(self, value: object) -> StringBuilder: # returns the builder so appends chain
+        text: str = str_(value)
+        self.parts.append(text)
+        self.length += len(text)
+        return self
+
+    def to_string(self) -> str:
+        if len(self.parts) > 1: self.parts = ["".join(self.parts)]
+        return self.parts[0] if self.parts else ""
+
+    def size(self) -> float:
+        return float(self.length)
+
+    def clear(self) -> StringBuilder:
+        self.parts, self.length = [], 0
+        return self
+
+    def __str__(self) -> str:
+        return "<StringBuilder>"
+
+    methods = {"append": (1, append), "toString": (0, to_string), "length": (0, size), "clear": (0, clear)}
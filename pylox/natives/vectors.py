@@ -0,0 +1,127 @@
+from __future__ import annotations
+import operator
+from array import array
+from functools import cache
+from itertools import repeat
+from typing import Callable
+from pylox.natives import native_class, NativeInstance
+from pylox.natives.strings import str_, index
+from pylox.natives.containers import LoxList
+from pylox.tokentype import TokenType
+from pylox.runtime_error import NativeError
+
+# FloatArray operators take a FloatArray of the same length or a number on either side and return a new FloatArray,
+# comparisons give 1 where they hold and 0 elsewhere. With numpy the loop is one ufunc over views of the arrays,
+# numpy is imported by the first operation that can use it rather than when --natives loads the module.
+OPERATORS: dict[TokenType, tuple[Callable[[float, float], object], str]] = {
+    TokenType.PLUS: (operator.add, "add"), TokenType.MINUS: (operator.sub, "subtract"),
+    TokenType.STAR: (operator.mul, "multiply"), TokenType.SLASH: (operator.truediv, "divide"),
+    TokenType.GREATER: (operator.gt, "greater"), TokenType.GREATER_EQUAL: (operator.ge, "greater_equal"),
+    TokenType.LESS: (operator.lt, "less"), TokenType.LESS_EQUAL: (operator.le, "less_equal"),
+}
+
+@cache
+def backend() -> object: # numpy, or None when it isn't installed and the element loops run through map() over the arrays
+    try: import numpy
+    except ImportError: return None
+    return numpy
+
+def number(value: object) -> float:
+    if value.__class__ is not float: raise NativeError("FloatArray elements must be numbers.")
+    return value
+
+@native_class("FloatArray", 1)
+class FloatArray(NativeInstance): # FloatArray(n) is n zeros, FloatArray(list) copies a List or FloatArray of numbers
+    __slots__ = ("data",)
+
+    def __init__(self, source: object):
+        if source.__class__ is float:
+            if source < 0 or not source.is_integer(): raise NativeError("FloatArray length must be a non-negative integer.")
+            self.data: array = array("d", bytes(8 * int(source)))
+        elif source.__class__ is LoxList: self.data = array("d", map(number, source.items))
+        elif source.__class__ is FloatArray: self.data = array("d", source.data)
+        else: raise NativeError("FloatArray() expects a length or a list of numbers.")
+
+    @classmethod
+    def of(cls, data: array) -> FloatArray: # wraps the array, no copy
+        result: FloatArray = cls.__new__(cls)
+        result.data = data
+        return result
+
+    def index_get(self, i: object) -> object:
+        data: array = self.data
+        if i.__class__ is float and 0 <= i < len(data) and i.is_integer(): return data[int(i)]
+        raise NativeError(self.bad_index(i))
+
+    def index_set(self, i: object, value: object) -> None:
+        data: array = self.data
+        if i.__class__ is float and 0 <= i < len(data) and i.is_integer(): data[int(i)] = number(value)
+        else: raise NativeError(self.bad_index(i))
+
+    def bad_index(self, i: object) -> str:
+        if i.__class__ is not float or not i.is_integer(): return "FloatArray index must be an integer."
+        return "FloatArray index out of range."
+
+    def binary(self, operator: TokenType, other: object, swapped: bool) -> object:
+        if operator not in OPERATORS: return NotImplemented
+        function, ufunc = OPERATORS[operator]
+        left: array = self.data
+        if other.__class__ is FloatArray:
+            right: array | float = other.data
+            if len(right) != len(left): raise NativeError("FloatArray operands must have the same length.")
+        elif other.__class__ is float: right = other
+        else: return NotImplemented
+        if swapped: left, right = right, left
+        if operator is TokenType.SLASH and (right == 0 if right.__class__ is float else 0.0 in right): raise NativeError("Cannot divide by zero.")
+        numpy = backend()
+        if numpy is not None:
+            result: array = array("d", bytes(8 * len(self.data)))
+            getattr(numpy, ufunc)(view(numpy, left), view(numpy, right), out=numpy.frombuffer(result))
+            return FloatArray.of(result)
+        if left.__class__ is float: return FloatArray.of(array("d", map(function, repeat(left), right)))
+        if right.__class__ is float: return FloatArray.of(array("d", map(function, left, repeat(right))))
+        return FloatArray.of(array("d", map(function, left, right)))
+
+    def length(self) -> float:
+        return float(len(self.data))
+
+    def sum(self) -> float:
+        numpy = backend()
+        if numpy is not None: return float(numpy.sum(numpy.frombuffer(self.data)))
+        return float(sum(self.data))
+
+    def min(self) -> float:
+        if not self.data: raise NativeError("min() of an empty FloatArray.")
+        numpy = backend()
+        if numpy is not None: return float(numpy.min(numpy.frombuffer(self.data)))
+        return min(self.data)
+
+    def max(self) -> float:
+        if not self.data: raise NativeError("max() of an empty FloatArray.")
+        numpy = backend()
+        if numpy is not None: return float(numpy.max(numpy.frombuffer(self.data)))
+        return max(self.data)
+
+    def dot(self, other: object) -> float:
+        if other.__class__ is not FloatArray: raise NativeError("dot() expects a FloatArray.")
+        if len(other.data) != len(self.data): raise NativeError("FloatArray operands must have the same length.")
+        numpy = backend()
+        if numpy is not None: return float(numpy.dot(numpy.frombuffer(self.data), numpy.frombuffer(other.data)))
+        return float(sum(map(operator.mul, self.data, other.data)))
+
+    def slice(self, start: object, end: object) -> FloatArray: # a copy, python slice bounds
+        return FloatArray.of(self.data[index(start, "slice"):index(end, "slice")])
+
+    def to_list(self) -> LoxList:
+        result: LoxList = LoxList()
+        result.items = self.data.tolist()
+        return result
+
+    def __str__(self) -> str:
+        return "FloatArray[" + ", ".join(map(str_, self.data)) + "]"
+
+    methods = {"length": (0, length), "sum": (0, sum), "min": (0, min), "max": (0, max), "dot": (1, dot),
+               "slice": (2, slice), "toList": (0, to_list)}
+
+def view(numpy: object, operand: array | float) -> object: # numpy over the array's buffer, numbers pass through as scalars
+    return operand if operand.__class__ is float else numpy.frombuffer(operand)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+from dataclasses import fields
+from typing import Optional
+from pylox.interpreter import Interpreter
+from pylox.expr import Expr, Literal, Grouping, Unary, Binary, Ternary, Variable, Assign, Logical, Call, Lambda, Get, Set, This, Super, Inner, Index, SetIndex
+from pylox.stmt import Stmt, Expression, Print, Var, Block, If, While, Break, Function, Return, Class
+from pylox.tokentype import TokenType
+from pylox.runtime_error import PyloxRuntimeError
+from pylox.rope import Rope
+
+class Optimizer:
+    """Pass over resolved trees that folds constant subexpressions into Literal nodes and drops the
+    If/While/Ternary/Logical branches that can never run.
+
+    Folding runs the tree-walker on the literal subtree, so the result is whatever the program would have
+    computed. A subtree that raises (1 / 0, -"a", ...) is left alone and still fails at runtime, on its own line.
+    Nodes carrying resolver Slots are reused, never rebuilt.
+    """
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.removed: int = 0 # nodes removed by the last optimize()
+
+    def optimize(self, statements: list[Stmt]) -> list[Stmt]:
+        before: int = count_nodes(statements)
+        statements = self.optimize_block(statements)
+        self.removed = before - count_nodes(statements)
+        return statements
+
+    def optimize_block(self, statements: list[Stmt | None]) -> list[Stmt]:
+        optimized: list[Stmt] = []
+        for statement in statements:
+            if statement is None: continue
+            statement = statement.accept(self)
+            if statement is not None: optimized.append(statement)
+        return optimized
+
+    def optimize_stmt(self, stmt: Stmt) -> Stmt: # for places that need a statement, a dropped one becomes an empty block
+        optimized: Optional[Stmt] = stmt.accept(self)
+        return optimized if optimized is not None else Block([])
+
+    def optimize_expr(self, expr: Expr) -> Expr:
+        return expr.accept(self)
+
+    def fold(self, expr: Expr) -> Expr: # expr only has Literal operands at this point
+        try: value: object = self.interpreter.evaluate(expr)
+        except PyloxRuntimeError: return expr
+        return Literal(str(value) if value.__class__ is Rope else value) # literals are shared with the other engines
+
+    def function(self, stmt: Function) -> Function:
+        return Function(stmt.name, stmt.params, self.optimize_block(stmt.body), stmt.is_getter, stmt.slot, stmt.layout)
+
+    def visit_Block_Stmt(self, stmt: Block) -> Block:
+        return Block(self.optimize_block(stmt.statements))
+
+    def visit_Class_Stmt(self, stmt: Class) -> Class:
+        return Class(stmt.name, stmt.superclasses, [self.function(m) for m in stmt.methods], [self.function(m) for m in stmt.class_methods], stmt.slot, stmt.super_slot)
+
+    def visit_Expression_Stmt(self, stmt: Expression) -> Stmt:
+        return Expression(self.optimize_expr(stmt.expression))
+
+    def visit_Function_Stmt(self, stmt: Function) -> Function:
+        return self.function(stmt)
+
+    def visit_If_Stmt(self, stmt: If) -> Optional[Stmt]:
+        condition: Expr = self.optimize_expr(stmt.condition)
+        if isinstance(condition, Literal):
+            if self.interpreter.is_truthy(condition.value): return self.optimize_stmt(stmt.then_branch)
+            if stmt.else_branch is None: return None
+            return self.optimize_stmt(stmt.else_branch)
+        else_branch: Optional[Stmt] = self.optimize_stmt(stmt.else_branch) if stmt.else_branch is not None else None
+        return If(condition, self.optimize_stmt(stmt.then_branch), else_branch)
+
+    def visit_Print_Stmt(self, stmt: Print) -> Print:
+        return Print(self.optimize_expr(stmt.expression))
+
+    def visit_Return_Stmt(self, stmt: Return) -> Return:
+        return Return(stmt.keyword, self.optimize_expr(stmt.value) if stmt.value is not None else None)
+
+    def visit_Var_Stmt(self, stmt: Var) -> Var:
+        if not isinstance(stmt.initializer, Expr): return stmt
+        return Var(stmt.name, self.optimize_expr(stmt.initializer), stmt.slot)
+
+    def visit_While_Stmt(self, stmt: While) -> Optional[Stmt]:
+        condition: Expr = self.optimize_expr(stmt.condition)
+        if isinstance(condition, Literal) and not self.interpreter.is_truthy(condition.value): return None
+        return While(condition, self.optimize_stmt(stmt.body))
+
+    def visit_Break_Stmt(self, stmt: Break) -> Break:
+        return stmt
+
+    def visit_Literal_Expr(self, expr: Literal) -> Expr:
+        return expr
+
+    def visit_Grouping_Expr(self, expr: Grouping) -> Expr:
+        expression: Expr = self.optimize_expr(expr.expression)
+        if isinstance(expression, Literal): return expression
+        return Grouping(expression)
+
+    def visit_Unary_Expr(self, expr: Unary) -> Expr:
+        right: Expr = self.optimize_expr(expr.right)
+        if isinstance(right, Literal): return self.fold(Unary(expr.operator, right))
+        return Unary(expr.operator, right)
+
+    def visit_Binary_Expr(self, expr: Binary) -> Expr:
+        left: Expr = self.optimize_expr(expr.left)
+        right: Expr = self.optimize_expr(expr.right)
+        if isinstance(left, Literal) and isinstance(right, Literal): return self.fold(Binary(left, expr.operator, right))
+        return Binary(left, expr.operator, right)
+
+    def visit_Logical_Expr(self, expr: Logical) -> Expr:
+        left: Expr = self.optimize_expr(expr.left)
+        right: Expr = self.optimize_expr(expr.right)
+        if isinstance(left, Literal): # 'or' stops at a truthy left operand, 'and' at a falsy one
+            if self.interpreter.is_truthy(left.value) == (expr.operator.token_type == TokenType.OR): return left
+            return right
+        return Logical(left, expr.operator, right)
+
+    def visit_Ternary_Expr(self, expr: Ternary) -> Expr:
+        condition: Expr = self.optimize_expr(expr.condition)
+        if isinstance(condition, Literal):
+            return self.optimize_expr(expr.expr_if_true if self.interpreter.is_truthy(condition.value) else expr.expr_if_false)
+        return Ternary(condition, expr.operator1, self.optimize_expr(expr.expr_if_true), expr.operator2, self.optimize_expr(expr.expr_if_false))
+
+    def visit_Call_Expr(self, expr: Call) -> Expr:
+        return Call(self.optimize_expr(expr.callee), expr.paren, [self.optimize_expr(a) for a in expr.arguments])
+
+    def visit_Lambda_Expr(self, expr: Lambda) -> Expr:
+        return Lambda(expr.params, self.optimize_block(expr.body), expr.layout)
+
+    def visit_Get_Expr(self, expr: Get) -> Expr:
+        return Get(self.optimize_expr(expr.obj), expr.name)
+
+    def visit_Set_Expr(self, expr: Set) -> Expr:
+        return Set(self.optimize_expr(expr.obj), expr.name, self.optimize_expr(expr.value))
+
+    def visit_Index_Expr(self, expr: Index) -> Expr:
+        return Index(self.optimize_expr(expr.obj), expr.bracket, self.optimize_expr(expr.index))
+
+    def visit_SetIndex_Expr(self, expr: SetIndex) -> Expr:
+        return SetIndex(self.optimize_expr(expr.obj), expr.bracket, self.optimize_expr(expr.index), self.optimize_expr(expr.value))
+
+    def visit_Assign_Expr(self, expr: Assign) -> Expr:
+        return Assign(expr.name, self.optimize_expr(expr.value), expr.slot)
+
+    def visit_Variable_Expr(self, expr: Variable) -> Expr:
+        return expr
+
+    def visit_This_Expr(self, expr: This) -> Expr:
+        return expr
+
+    def visit_Super_Expr(self, expr: Super) -> Expr:
+        return expr
+
+    def visit_Inner_Expr(self, expr: Inner) -> Expr:
+        return expr
+
+def count_nodes(node: object) -> int:
+    if isinstance(node, list): return sum(count_nodes(n) for n in node)
+    if not isinstance(node, (Expr, Stmt)): return 0
+    return 1 + sum(count_nodes(getattr(node, f.name)) for f in fields(node))
@@ -1,25 +1,27 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Optional, Iterator
 from pylox.tokens import Token
-from pylox.expr import Expr, Binary, Unary, Literal, Grouping, Ternary, Variable, Assign, Logical, Call, Lambda, Get, Set, This, Super, Inner
+from pylox.expr import Expr, Binary, Unary, Literal, Grouping, Ternary, Variable, Assign, Logical, Call, Lambda, Get, Set, This, Super, Inner, Index, SetIndex
 from pylox.tokentype import TokenType
 from pylox.error import ErrorReporter
 from pylox.stmt import Stmt, Print, Expression, Var, Block, If, While, Break, Function, Return, Class
 from pylox.environment import UnInitValue
+from pylox.scanner import TokenStream
 
 class Parser:
-    def __init__(self, tokens: list[Token]):
-        self._tokens: list[Token] = tokens
+    def __init__(self, tokens: list[Token] | TokenStream):
+        self._tokens: list[Token] | TokenStream = tokens # only ever indexed at current and current - 1
         self.current: int = 0
         self.in_loop: bool = False
         self.in_function: tuple[bool, Optional[Token]] = (False, None)
 
     def parse(self) -> list[Stmt]:
-        statements = []
+        return list(self.declarations())
+
+    def declarations(self) -> Iterator[Stmt]: # top-level declarations, each one yielded as soon as it's parsed
         while not self.is_at_end():
             stmt = self.declaration()
-            if stmt is not None: statements.append(stmt)
-        return statements
+            if stmt is not None: yield stmt
 
     def declaration(self) -> Optional[Stmt]:
         try:
@@ -69,7 +71,7 @@ class Parser:
                     if not self.match([TokenType.COMMA]): break
             self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
         self.consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.") # fstrings need double '{' to escape
-        body: list[Stmt | None] = self.block()
+        body: list[Stmt | None] = self.function_body()
         assert isinstance(name, Token)
         self.in_function = (False, None)
         return Function(name, parameters, body, is_getter=is_getter)
@@ -106,6 +108,7 @@ class Parser:
         return Break()
     
     def for_statement(self) -> Stmt: # desugaring into nodes the interpreter already 
+        enclosing_loop: bool = self.in_loop
         self.in_loop = True
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
         initializer: Optional[Stmt] = None
@@ -123,16 +126,17 @@ class Parser:
         if condition is None: condition = Literal(True)
         body = While(condition, body)
         if initializer is not None: body = Block([initializer, body])
-        self.in_loop = False
+        self.in_loop = enclosing_loop
         return body
     
     def while_statement(self) -> Stmt:
+        enclosing_loop: bool = self.in_loop
         self.in_loop = True
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
         condition: Expr = self.expression()
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after 'while'.")
         body: Stmt = self.statement()
-        self.in_loop = False
+        self.in_loop = enclosing_loop
         return While(condition, body)
     
     def if_statement(self) -> Stmt:
@@ -144,6 +148,13 @@ class Parser:
         if self.match([TokenType.ELSE]): else_branch = self.statement()
         return If(condition, then_branch, else_branch)
     
+    def function_body(self) -> list[Stmt | None]: # a break can't reach a loop outside the function
+        enclosing_loop: bool = self.in_loop
+        self.in_loop = False
+        body: list[Stmt | None] = self.block()
+        self.in_loop = enclosing_loop
+        return body
+
     def block(self) -> list[Stmt | None]:
         statements: list[Stmt | None] = []
         while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end(): statements.append(self.declaration())
@@ -171,6 +182,7 @@ class Parser:
             elif isinstance(expr, Get):
                 get: Get = expr
                 return Set(get.obj, get.name, value)
+            elif isinstance(expr, Index): return SetIndex(expr.obj, expr.bracket, expr.index, value)
             self.error(equals, "Invalid assignment target.")
         return expr
     
@@ -334,6 +346,10 @@ class Parser:
             elif self.match([TokenType.DOT]):
                 name: Token = self.consume(TokenType.IDENTIFIER, "Expect propertyy name after '.'.")
                 expr = Get(expr, name)
+            elif self.match([TokenType.LEFT_BRACKET]):
+                index: Expr = self.expression()
+                bracket: Token = self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after index.")
+                expr = Index(expr, bracket, index)
             else: break
         return expr
     
@@ -379,7 +395,7 @@ class Parser:
                     if not self.match([TokenType.COMMA]): break
             self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
             self.consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.") # fstrings need double '{' to escape
-            body: list[Stmt | None] = self.block()
+            body: list[Stmt | None] = self.function_body()
             return Lambda(parameters, body)
         if self.match([TokenType.LEFT_PAREN]):
             expr: Expr = self.expression()
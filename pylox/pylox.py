@@ -1,6 +1,7 @@
 # from __future__ import annotations
 import sys
-from pylox.scanner import Scanner
+import argparse
+from pylox.scanner import Scanner, RegexScanner, StreamingScanner, TokenStream
 from pylox.tokens import Token
 from pylox.tokentype import TokenType
 from pylox.error import ErrorReporter
@@ -10,26 +11,78 @@ from pylox.expr import Expr
 from pylox.interpreter import Interpreter
 from pylox.stmt import Stmt
 from pylox.resolver import Resolver
+from pylox.optimizer import Optimizer
+from pylox.vm import VM, MAX_DEPTH
+from pylox.closure_compiler import ClosureCompiler
+from pylox import cache
+from pylox.cache import Program
+from typing import Optional, TextIO
+
+USAGE: str = "Usage: pylox [--engine=tree|vm|closure] [--scanner=regex|char] [--optimize] [--dump-escapes] [--pipeline] [--max-depth=N] [--natives=module,...] [--no-cache] [--clear-cache] [script]"
 
 class Pylox:
     interpreter: Interpreter = Interpreter()
+    engine: Interpreter | VM | ClosureCompiler = interpreter # whatever runs the resolved program, the tree-walker by default
+    # RegexScanner is the default: it gives Scanner's exact tokens and errors (tests/test_scanner.py) at about 1.6x the speed, and
+    # only it can stream a file. Scanner, the char at a time reference implementation, is --scanner=char and reads files whole.
+    scanner: type[Scanner] = RegexScanner
     repl: bool = False
+    use_cache: bool = True # keep resolved scripts in __loxcache__
+    pipeline: bool = False # run each top-level declaration as soon as it's parsed
+    optimize: bool = False # constant fold resolved trees before running them
+    dump_escapes: bool = False # print which locals the resolver boxed in cells
 
     @staticmethod
     def main():
-        if len(sys.argv) > 2: # 2 cause python always takes .py file name as first argument
-            print("Usage: pylox [script]") # TODO: make pylox work like this instead of running like a python script
-            sys.exit(64)
-        elif len(sys.argv) == 2: Pylox.run_file(sys.argv[1])
+        arg_parser = argparse.ArgumentParser(prog="pylox", usage=USAGE, add_help=False)
+        arg_parser.add_argument("script", nargs="?")
+        arg_parser.add_argument("--engine", choices=["tree", "vm", "closure"], default="tree")
+        arg_parser.add_argument("--scanner", choices=["regex", "char"], default="regex")
+        arg_parser.add_argument("--optimize", action="store_true")
+        arg_parser.add_argument("--dump-escapes", action="store_true")
+        arg_parser.add_argument("--pipeline", action="store_true")
+        arg_parser.add_argument("--max-depth", type=int, default=MAX_DEPTH) # nested Lox calls allowed by the vm
+        arg_parser.add_argument("--natives", default="") # python modules registering more natives, comma separated
+        arg_parser.add_argument("--no-cache", action="store_true")
+        arg_parser.add_argument("--clear-cache", action="store_true")
+        arg_parser.error = Pylox.usage_error
+        args = arg_parser.parse_args()
+        if args.natives:
+            try: Pylox.interpreter.load_natives(args.natives.split(","))
+            except ImportError as error: Pylox.usage_error(f"--natives: {error}")
+        if args.engine == "vm": Pylox.engine = VM(Pylox.interpreter, args.max_depth)
+        elif args.engine == "closure": Pylox.engine = ClosureCompiler(Pylox.interpreter)
+        if args.scanner == "char": Pylox.scanner = Scanner
+        if args.clear_cache: cache.clear(args.script)
+        Pylox.use_cache = not args.no_cache
+        Pylox.pipeline = args.pipeline
+        Pylox.optimize = args.optimize
+        Pylox.dump_escapes = args.dump_escapes
+        if args.script is not None: Pylox.run_file(args.script)
         else: 
             Pylox.repl = True
             Pylox.run_prompt()
 
+    @staticmethod
+    def usage_error(message: str): # also argparse's error handler, message names the argument that was wrong
+        print(f"pylox: {message}", file=sys.stderr)
+        print(USAGE)
+        sys.exit(64)
+
     @staticmethod
     def run_file(path: str): 
-        with open(path, encoding="utf-8", mode="r") as file:
-            src_string: str = file.read()
-        Pylox.run(src_string)
+        if Pylox.pipeline: # nothing is cached, a pipelined run never holds the whole program
+            with open(path, encoding="utf-8", mode="r") as file: Pylox.run_pipelined(file.read() if Pylox.scanner is Scanner else file)
+            if ErrorReporter.had_error: sys.exit(65)
+            if ErrorReporter.had_runtime_error: sys.exit(70)
+            return
+        key: Optional[str] = cache.source_key(path, Pylox.optimize) if Pylox.use_cache else None
+        program: Optional[Program] = cache.load(path, key) if key is not None and not Pylox.dump_escapes else None # the dump needs the resolver to run
+        if program is None:
+            with open(path, encoding="utf-8", mode="r") as file: Pylox.run(file.read() if Pylox.scanner is Scanner else file, path, key)
+        else: # cache hit, scanning, parsing and resolving are skipped entirely
+            for warning in program.warnings: ErrorReporter.replay_warning(warning)
+            Pylox.execute(program, path, key, cached=True)
         if ErrorReporter.had_error: sys.exit(65)
         if ErrorReporter.had_runtime_error: sys.exit(70)
 
@@ -43,16 +96,21 @@ class Pylox:
             except EOFError: break
 
     @classmethod
-    def run(cls, src: str):
-        scanner = Scanner(src)
-        tokens: list[Token] = scanner.scan_tokens()
+    def tokens(cls, src: str | TextIO) -> list[Token] | TokenStream:
+        # a file is scanned lazily while the parser pulls tokens, only a window of them is ever held in memory
+        if isinstance(src, str): return cls.scanner(src).scan_tokens()
+        return TokenStream(StreamingScanner(src).stream_tokens())
+
+    @classmethod
+    def run(cls, src: str | TextIO, script: Optional[str] = None, key: Optional[str] = None):
+        tokens: list[Token] | TokenStream = cls.tokens(src)
         parser = Parser(tokens)
 
         if Pylox.repl and tokens[-2].token_type is not TokenType.SEMICOLON and tokens[0].token_type not in [TokenType.PRINT, TokenType.VAR, TokenType.WHILE, TokenType.IF, TokenType.FOR]:
             expression: Expr | None = parser.expression()
             if ErrorReporter.had_error: return
             print("\nEval:")
-            print(cls.interpreter.stringify(cls.interpreter.evaluate(expression)))
+            print(cls.interpreter.stringify(cls.engine.evaluate(expression)))
             return
 
         statements: list[Stmt] = parser.parse()
@@ -61,12 +119,56 @@ class Pylox:
         # print(AstPrinter().print(statements))
 
         if ErrorReporter.had_error: return
-        resolver: Resolver = Resolver(cls.interpreter)
+        warning_count: int = len(ErrorReporter.warnings)
+        resolver: Resolver = Resolver(cls.interpreter, record_layouts=cls.dump_escapes)
         resolver.resolve(statements)
+        if cls.dump_escapes: print("\n".join(resolver.escape_report()), file=sys.stderr)
         
         if ErrorReporter.had_error: return
+        if cls.optimize:
+            optimizer: Optimizer = Optimizer(cls.interpreter)
+            statements = optimizer.optimize(statements)
+            print(f"[optimizer] removed {optimizer.removed} nodes", file=sys.stderr)
+        cls.execute(Program(statements, ErrorReporter.warnings[warning_count:], resolver.script_layout.size), script, key)
+
+    @classmethod
+    def execute(cls, program: Program, script: Optional[str], key: Optional[str], cached: bool = False):
+        if isinstance(cls.engine, VM) and program.bytecode is None:
+            program.bytecode = cls.engine.compile(program.statements)
+            cached = False # entry needs updating with the bytecode
+        if key is not None and not cached: cache.store(script, key, program)
         print("\nEval:")
-        cls.interpreter.interpret(statements)
+        cls.interpreter.reserve_slots(program.frame_size)
+        if isinstance(cls.engine, VM): cls.engine.run_script(program.bytecode)
+        else: cls.engine.interpret(program.statements)
+
+    @classmethod
+    def run_pipelined(cls, src: str | TextIO):
+        # parse, resolve and run one top-level declaration at a time, each tree is dropped once it has run.
+        # Functions still see globals declared after them, unresolved names are looked up at runtime anyway.
+        parser = Parser(cls.tokens(src))
+        resolver: Resolver = Resolver(cls.interpreter, record_layouts=cls.dump_escapes)
+        optimizer: Optimizer = Optimizer(cls.interpreter)
+        removed: int = 0
+        running: bool = False
+        for statement in parser.declarations():
+            if ErrorReporter.had_error: continue # keep parsing to report every syntax error, but run nothing else
+            resolver.resolve([statement])
+            if ErrorReporter.had_error: continue
+            if cls.optimize:
+                statements: list[Stmt] = optimizer.optimize([statement])
+                removed += optimizer.removed
+                if not statements: continue
+                statement = statements[0]
+            if not running:
+                print("\nEval:")
+                running = True
+            cls.interpreter.reserve_slots(resolver.script_layout.size)
+            cls.engine.interpret([statement])
+            if ErrorReporter.had_runtime_error: break
+        if not running and not ErrorReporter.had_error and not ErrorReporter.had_runtime_error: print("\nEval:")
+        if cls.optimize: print(f"[optimizer] removed {removed} nodes", file=sys.stderr)
+        if cls.dump_escapes: print("\n".join(resolver.escape_report()), file=sys.stderr)
 
 
 if __name__ == "__main__":
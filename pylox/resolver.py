@@ -3,10 +3,11 @@ from dataclasses import dataclass, field
 from enum import Enum, auto
 from pylox.interpreter import Interpreter
 from pylox.stmt import Stmt, Block, Var, Function, Expression, If, Print, Return, While, Break, Class
-from pylox.expr import Expr, Variable, Assign, Binary, Call, Grouping, Literal, Logical, Unary, Ternary, Lambda, Get, Set, This, Super, Inner
+from pylox.expr import Expr, Variable, Assign, Binary, Call, Grouping, Literal, Logical, Unary, Ternary, Lambda, Get, Set, This, Super, Inner, Index, SetIndex
 from pylox.tokens import Token
 from pylox.error import ErrorReporter
-from pylox.environment import UnInitValue
+from pylox.environment import UnInitValue, Slot, FrameLayout, LocalInfo, LOCAL, CELL, UPVALUE
+from typing import Optional
 
 class FunctionType(Enum):
     NONE = auto()
@@ -19,14 +20,46 @@ class ClassType(Enum):
     CLASS = auto()
     SUBCLASS = auto()
 
+class FrameLocal: # a local variable's slot in the frame of the function declaring it
+    __slots__ = ("function", "index", "info", "is_param", "slots")
+
+    def __init__(self, function: FunctionFrame, name: str, line: int, is_param: bool = False):
+        self.function = function
+        self.index: int = function.layout.allocate(name, line)
+        self.info: LocalInfo = function.layout.locals[self.index] # where the capture analysis ends up
+        self.is_param = is_param # parameters and 'this' arrive in the frame, other locals get a declaration Slot
+        self.slots: list[Slot] = [] # every Slot in the declaring function reaching this local, flipped to CELL once a closure captures it
+
+class FunctionFrame: # the function whose body is being resolved, for the tree-walker's frame layout
+    __slots__ = ("layout", "enclosing", "upvalue_idxs", "this")
+
+    def __init__(self, layout: FrameLayout, enclosing: Optional[FunctionFrame], method: Optional[Token] = None):
+        self.layout = layout
+        self.enclosing = enclosing
+        self.upvalue_idxs: dict[FrameLocal, int] = {}
+        self.this: Optional[FrameLocal] = None
+        if method is not None:
+            layout.params_at = 1
+            self.this = FrameLocal(self, "this", method.line, is_param=True) # slot 0
+
+THIS: object = object() # frame local of the 'this' and 'inner' scope entries, stands for the enclosing method's own 'this' slot
+
 @dataclass(frozen=True)
 class Resolver:
     interpreter: Interpreter
-    # scope is a dict with var name keys and values as list of [is_resolved, is_used, token_for_error_reporting, uniq_index_for_var_in_each_scope]
-    __scopes: list[dict[str, list[bool, bool, Token, int]]] = field(default_factory=list)
+    # scope is a dict with var name keys and values as list of [is_resolved, is_used, token_for_error_reporting, uniq_index_for_var_in_each_scope, frame_local]
+    __scopes: list[dict[str, list[bool, bool, Token, int, FrameLocal | object]]] = field(default_factory=list)
     current_function: FunctionType = FunctionType.NONE
     current_class: ClassType = ClassType.NONE
     var_counts: list[int] = field(default_factory=list)
+    script_layout: FrameLayout = field(default_factory=FrameLayout) # frame of the top level code, holds the locals of its blocks
+    functions: list[FunctionFrame] = field(default_factory=list)
+    record_layouts: bool = False # keep every layout for escape_report(), only --dump-escapes needs them
+    layouts: list[tuple[str, FrameLayout]] = field(default_factory=list) # every frame resolved so far with a label, when recording
+
+    def __post_init__(self):
+        self.functions.append(FunctionFrame(self.script_layout, None))
+        if self.record_layouts: self.layouts.append(("script", self.script_layout))
 
     def set_current_function(self, new_function: FunctionType) -> None: # bad code? why freeze then change value of an attribute
         object.__setattr__(self, "current_function", new_function)
@@ -37,6 +70,14 @@ class Resolver:
     def resolve(self, statements: list[Stmt]) -> None:
         for statement in statements: self.resolve_stmt(statement)
 
+    def escape_report(self) -> list[str]: # for --dump-escapes, a line per frame then a line per slot in it
+        report: list[str] = []
+        for label, layout in self.layouts:
+            report.append(f"[escapes] {label}: {layout.size} slots, {len(layout.captured())} captured, {len(layout.upvalues)} upvalues")
+            for i, info in enumerate(layout.locals):
+                report.append(f"[escapes]   {i:>3} {info.name:<16} line {info.line:<5} {'cell' if info.captured else 'slot'}")
+        return report
+
     def resolve_stmt(self, stmt: Stmt) -> None:
         stmt.accept(self)
 
@@ -51,20 +92,21 @@ class Resolver:
     def visit_Class_Stmt(self, stmt: Class) -> None:
         enclosing_class: ClassType = self.current_class
         self.set_current_class(ClassType.CLASS)
-        self.declare(stmt.name)
+        self.declare(stmt.name, stmt.slot)
         self.define(stmt.name)
-        if stmt.superclasses and any([stmt.name.lexeme == sc.name.lexeme for sc in stmt.superclasses]): ErrorReporter.error("A class can't inherit from itself.", stmt.superclass.name)
+        for sc in stmt.superclasses:
+            if stmt.name.lexeme == sc.name.lexeme: ErrorReporter.error("A class can't inherit from itself.", token=sc.name)
         if stmt.superclasses:
             self.set_current_class(ClassType.SUBCLASS)
             for sc in stmt.superclasses: self.resolve_expr(sc)
         if stmt.superclasses:
             self.begin_scope()
-            self.__scopes[-1]["super"] = [True, True, stmt.name, self.var_counts[-1]]
+            self.__scopes[-1]["super"] = [True, True, stmt.name, self.var_counts[-1], self.frame_local(stmt.super_slot, "super", stmt.name.line)]
             self.var_counts[-1] += 1
         self.begin_scope()
-        self.__scopes[-1]["this"] = [True, True, stmt.name, self.var_counts[-1]] # is_used is True for 'this' even if its not used in anywere in te class as its suppose to be hidden
+        self.__scopes[-1]["this"] = [True, True, stmt.name, self.var_counts[-1], THIS] # is_used is True for 'this' even if its not used in anywere in te class as its suppose to be hidden
         self.var_counts[-1] += 1
-        self.__scopes[-1]["inner"] = [True, True, stmt.name, self.var_counts[-1]]
+        self.__scopes[-1]["inner"] = [True, True, stmt.name, self.var_counts[-1], THIS]
         self.var_counts[-1] += 1
         for method in stmt.methods:
             declaration: FunctionType = FunctionType.METHOD
@@ -89,17 +131,47 @@ class Resolver:
         self.var_counts.pop()
 
     def visit_Var_Stmt(self, stmt: Var) -> None:
-        self.declare(stmt.name)
+        self.declare(stmt.name, stmt.slot)
         if stmt.initializer is not None and not isinstance(stmt.initializer, UnInitValue): self.resolve_expr(stmt.initializer)
         self.define(stmt.name)
 
-    def declare(self, name: Token) -> None:
+    def declare(self, name: Token, slot: Optional[Slot] = None) -> None: # slot is where the declaration stores the value, None for parameters
         if len(self.__scopes) == 0: return
         scope: dict[str, list[bool, bool, Token]] = self.__scopes[-1]
         if name.lexeme in scope: ErrorReporter.error("Already a variable with this name in this scope.", token=name)
-        scope[name.lexeme] = [False, False, name, self.var_counts[-1]]
+        scope[name.lexeme] = [False, False, name, self.var_counts[-1], self.frame_local(slot, name.lexeme, name.line)]
         self.var_counts[-1] += 1
 
+    def frame_local(self, slot: Optional[Slot], name: str, line: int) -> FrameLocal:
+        local: FrameLocal = FrameLocal(self.functions[-1], name, line, is_param=slot is None)
+        if slot is not None: self.resolve_frame(local, slot)
+        return local
+
+    def resolve_frame(self, local: FrameLocal | object, slot: Slot) -> None: # the tree-walker's half of resolving a local
+        function: FunctionFrame = self.functions[-1]
+        if local is THIS:
+            method: FunctionFrame = function
+            while method.this is None and method.enclosing is not None: method = method.enclosing
+            if method.this is None: return # 'this' outside of a method, already reported
+            local = method.this
+        if local.function is function:
+            slot.kind, slot.index = CELL if local.info.captured else LOCAL, local.index
+            local.slots.append(slot)
+            return
+        if not local.info.captured:
+            local.info.captured = True
+            for s in local.slots: s.kind = CELL
+            if local.is_param: local.function.layout.cells.append(local.index)
+        slot.kind, slot.index = UPVALUE, self.upvalue(function, local)
+
+    def upvalue(self, function: FunctionFrame, local: FrameLocal) -> int:
+        if local in function.upvalue_idxs: return function.upvalue_idxs[local]
+        assert function.enclosing is not None
+        if function.enclosing is local.function: function.layout.upvalues.append((True, local.index))
+        else: function.layout.upvalues.append((False, self.upvalue(function.enclosing, local)))
+        function.upvalue_idxs[local] = len(function.layout.upvalues) - 1
+        return function.upvalue_idxs[local]
+
     def define(self, name: Token) -> None:
         if len(self.__scopes) == 0: return
         self.__scopes[-1][name.lexeme][0] = True
@@ -115,6 +187,7 @@ class Resolver:
         for i in range(len(self.__scopes) - 1, -1, -1):
             if name.lexeme in self.__scopes[i]:
                 self.interpreter.resolve(expr, len(self.__scopes) - 1 - i, self.__scopes[i][name.lexeme][3])
+                self.resolve_frame(self.__scopes[i][name.lexeme][4], expr.slot)
                 return
             
     def visit_Assign_Expr(self, expr: Assign) -> None:
@@ -122,20 +195,24 @@ class Resolver:
         self.resolve_local(expr, expr.name)
 
     def visit_Function_Stmt(self, stmt: Function) -> None:
-        self.declare(stmt.name)
+        self.declare(stmt.name, stmt.slot)
         self.define(stmt.name)
         self.resolve_function(stmt, FunctionType.FUNCTION)
 
-    def resolve_function(self, stmt: Function, type: FunctionType) -> None:
+    def resolve_function(self, stmt: Function | Lambda, type: FunctionType) -> None:
         enclosing_function: FunctionType = self.current_function
         # self.current_function = type
         self.set_current_function(type)
+        method: bool = type in (FunctionType.METHOD, FunctionType.INITIALIZER)
+        self.functions.append(FunctionFrame(stmt.layout, self.functions[-1], stmt.name if method else None))
+        if self.record_layouts: self.layouts.append((f"fn {stmt.name.lexeme}" if isinstance(stmt, Function) else "lambda", stmt.layout))
         self.begin_scope()
         for param in stmt.params:
             self.declare(param)
             self.define(param)
         self.resolve(stmt.body)
         self.end_scope()
+        self.functions.pop()
         # self.current_function = enclosing_function
         self.set_current_function(enclosing_function)
 
@@ -188,10 +265,20 @@ class Resolver:
         self.resolve_expr(expr.value)
         self.resolve_expr(expr.obj)
 
+    def visit_Index_Expr(self, expr: Index) -> None:
+        self.resolve_expr(expr.obj)
+        self.resolve_expr(expr.index)
+
+    def visit_SetIndex_Expr(self, expr: SetIndex) -> None:
+        self.resolve_expr(expr.obj)
+        self.resolve_expr(expr.index)
+        self.resolve_expr(expr.value)
+
     def visit_Super_Expr(self, expr: Super) -> None:
         if self.current_class == ClassType.NONE: ErrorReporter.error("Can't use 'super' outside of a class.", token=expr.keyword)
         elif self.current_class != ClassType.SUBCLASS: ErrorReporter.error("Can't use 'super' in a class with no superclass.", token=expr.keyword)
         self.resolve_local(expr, expr.keyword)
+        self.resolve_frame(THIS, expr.this_slot)
 
     def visit_Inner_Expr(self, expr: Inner) -> None:
         if self.current_class == ClassType.NONE: ErrorReporter.error("Can't use 'inner' outside of a class.", token=expr.keyword)
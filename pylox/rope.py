@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Optional
+
+# Lox strings built with + in the tree-walker. Short results stay plain str, once a concatenation reaches
+# ROPE_MIN characters the result is a Rope: `s = s + x` in a loop then appends to a shared list of parts
+# instead of copying s every time, and the text is joined only when something reads it (print, ==, hashing,
+# natives). Ropes only come out of +, everything else still sees str.
+
+ROPE_MIN: int = 256
+
+class Rope:
+    __slots__ = ("parts", "count", "flat")
+
+    def __init__(self, parts: list[str], count: int):
+        self.parts = parts # may be shared with the ropes this one was appended to, only parts[:count] belong to it
+        self.count = count
+        self.flat: Optional[str] = None
+
+    def append(self, text: str) -> Rope: # amortized O(1), like appending to a go slice
+        parts: list[str] = self.parts
+        if len(parts) != self.count: parts = parts[:self.count] # another rope already appended to this buffer
+        parts.append(text)
+        return Rope(parts, self.count + 1)
+
+    def __str__(self) -> str:
+        if self.flat is None:
+            self.flat = "".join(self.parts if len(self.parts) == self.count else self.parts[:self.count])
+            self.parts, self.count = [self.flat], 1 # later appends start from the joined text
+        return self.flat
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is Rope or other.__class__ is str: return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+def piece(value: object) -> str: # the text + adds for value
+    if value.__class__ is float: return str(value)[:-2]
+    return str(value)
+
+def concat(left: object, right: object) -> str | Rope: # left + right with at least one of them a string
+    if left.__class__ is Rope: return left.append(piece(right))
+    text: str = piece(left) + piece(right)
+    if len(text) < ROPE_MIN: return text
+    return Rope([text], 1)
@@ -3,4 +3,7 @@ from pylox.tokens import Token
 class PyloxRuntimeError(RuntimeError):
     def __init__(self, token: Token, message: str):
         super().__init__(message)
-        self.token = token
\ No newline at end of file
+        self.token = token
+
+class NativeError(Exception): # raised by natives, which never see a token, the call site reports it as a PyloxRuntimeError on its line
+    pass
@@ -1,4 +1,6 @@
+import re
 from dataclasses import dataclass
+from typing import Iterator, TextIO
 from pylox.tokens import Token
 from pylox.tokentype import TokenType
 # from pylox import Pylox
@@ -56,6 +58,8 @@ class Scanner:
             case ')': self.add_token(TokenType.RIGHT_PAREN)
             case '{': self.add_token(TokenType.LEFT_BRACE)
             case '}': self.add_token(TokenType.RIGHT_BRACE)
+            case '[': self.add_token(TokenType.LEFT_BRACKET)
+            case ']': self.add_token(TokenType.RIGHT_BRACKET)
             case ',': self.add_token(TokenType.COMMA)
             case '.': self.add_token(TokenType.DOT)
             case '-': self.add_token(TokenType.MINUS)
@@ -81,6 +85,7 @@ class Scanner:
                             self.advance()
                             self.advance()
                             self.multi_line_comment_count -= 1
+                            if self.is_at_end(): break
                         self.advance()
                 else: self.add_token(TokenType.SLASH)
 
@@ -128,7 +133,7 @@ class Scanner:
             if self.peek() == '\n': self.line += 1
             self.advance()
         if self.is_at_end(): 
-            ErrorReporter.error(self.line, "Unterminated string.")
+            ErrorReporter.error("Unterminated string.", line=self.line)
             return
         self.advance()
         value = self._scanner_data._source[self.start+1:self.current-1] # trim the surrounding quotes
@@ -156,4 +161,177 @@ class Scanner:
 
 
 
-        
\ No newline at end of file
+        
+
+class RegexScanner(Scanner):
+    """Drop-in replacement for Scanner that consumes whole lexemes with one compiled master regex instead of
+    dispatching on every character.
+
+    The token stream, line numbers and errors are the same as Scanner's, including how it treats multi-line
+    comments: a '/' inside one ends it early, the character right after '*/' is skipped, newlines inside
+    comments aren't counted and a comment ended early still counts towards closing the next one.
+    """
+    TOKEN_RE: re.Pattern = re.compile(r"""
+        (?P<SPACE>[ \t\r\n]+)
+      | (?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+      | (?P<OPERATOR>[!=<>]=?|[(){}[\],.\-+;?:*])
+      | (?P<STRING>"[^"]*"?)
+      | (?P<COMMENT>//[^\n]*)
+      | (?P<BLOCK_COMMENT>/\*)
+      | (?P<SLASH>/)
+      | (?P<UNEXPECTED>.)
+    """, re.VERBOSE | re.DOTALL)
+
+    operators: dict[str, TokenType] = {
+        "(": TokenType.LEFT_PAREN, ")": TokenType.RIGHT_PAREN, "{": TokenType.LEFT_BRACE, "}": TokenType.RIGHT_BRACE,
+        ",": TokenType.COMMA, ".": TokenType.DOT, "-": TokenType.MINUS, "+": TokenType.PLUS, ";": TokenType.SEMICOLON,
+        "?": TokenType.QUESTION, ":": TokenType.COLON, "*": TokenType.STAR, "[": TokenType.LEFT_BRACKET, "]": TokenType.RIGHT_BRACKET,
+        "!": TokenType.BANG, "!=": TokenType.BANG_EQUAL, "=": TokenType.EQUAL, "==": TokenType.EQUAL_EQUAL,
+        "<": TokenType.LESS, "<=": TokenType.LESS_EQUAL, ">": TokenType.GREATER, ">=": TokenType.GREATER_EQUAL,
+    }
+
+    def scan_tokens(self) -> list[Token]:
+        source: str = self._scanner_data._source
+        tokens: list[Token] = self._scanner_data._tokens
+        append = tokens.append
+        keywords: dict[str, TokenType] = self.keywords
+        operators: dict[str, TokenType] = self.operators
+        line: int = self.line
+        self.current = 0
+        while self.current < len(source):
+            match = self.TOKEN_RE.scanner(source, self.current).match # matches back to back from current
+            while (m := match()) is not None:
+                kind: str = m.lastgroup
+                text: str = m.group()
+                if kind == "SPACE": 
+                    if "\n" in text: line += text.count("\n")
+                elif kind == "IDENTIFIER": append(Token(keywords.get(text, TokenType.IDENTIFIER), text, None, line))
+                elif kind == "OPERATOR": append(Token(operators[text], text, None, line))
+                elif kind == "NUMBER": append(Token(TokenType.NUMBER, text, float(text), line))
+                elif kind == "STRING":
+                    line += text.count("\n")
+                    if len(text) == 1 or text[-1] != '"': ErrorReporter.error("Unterminated string.", line=line)
+                    else: append(Token(TokenType.STRING, text, text[1:-1], line))
+                elif kind == "COMMENT": pass
+                elif kind == "SLASH": append(Token(TokenType.SLASH, text, None, line))
+                elif kind == "BLOCK_COMMENT":
+                    self.current = self.block_comment(m.end())
+                    break
+                else: ErrorReporter.error("Unexpected character.", line=line)
+            else: self.current = len(source)
+        self.line = line
+        append(Token(TokenType.EOF, "", None, line))
+        return tokens
+
+    def block_comment(self, current: int) -> int:
+        # same walk as Scanner.scan_token, jumping straight to the next '/' since nothing before it can end the comment
+        source: str = self._scanner_data._source
+        self.multi_line_comment_count += 1
+        while current < len(source) and source[current] != '/':
+            if self.multi_line_comment_count == 0: break
+            slash: int = source.find('/', current)
+            if slash == -1: return len(source)
+            if slash - 1 < current or source[slash - 1] != '*': return slash
+            self.multi_line_comment_count -= 1
+            current = slash + 2 # '*/' and the character after it
+        return min(current, len(source))
+
+
+class StreamingScanner(RegexScanner):
+    """RegexScanner over a text file object, reading it a chunk at a time and yielding tokens as they're matched.
+
+    Only the unscanned tail of the current chunk is kept, plus whatever a lexeme spanning chunks needs, so
+    memory use doesn't grow with the size of the source.
+    """
+    CHUNK_SIZE: int = 1 << 16
+
+    def __init__(self, file: TextIO):
+        super().__init__("")
+        self.file = file
+        self.buffer: str = ""
+        self.at_eof: bool = False
+
+    def scan_tokens(self) -> list[Token]:
+        return list(self.stream_tokens())
+
+    def fill(self) -> bool: # appends the next chunk to the buffer, False once the file is exhausted
+        if self.at_eof: return False
+        chunk: str = self.file.read(self.CHUNK_SIZE)
+        if not chunk: self.at_eof = True
+        self.buffer += chunk
+        return not self.at_eof
+
+    def stream_tokens(self) -> Iterator[Token]:
+        match = self.TOKEN_RE.match
+        keywords: dict[str, TokenType] = self.keywords
+        operators: dict[str, TokenType] = self.operators
+        line: int = self.line
+        pos: int = 0
+        while True:
+            m = match(self.buffer, pos)
+            # out of input, or too close to the end of the buffer to tell where the lexeme stops ('1.' needs to see a digit)
+            if m is None or (len(self.buffer) - m.end() < 2 and not self.at_eof):
+                if self.at_eof: break
+                self.buffer, pos = self.buffer[pos:], 0
+                self.fill()
+                continue
+            kind: str = m.lastgroup
+            text: str = m.group()
+            pos = m.end()
+            if kind == "SPACE": 
+                if "\n" in text: line += text.count("\n")
+            elif kind == "IDENTIFIER": yield Token(keywords.get(text, TokenType.IDENTIFIER), text, None, line)
+            elif kind == "OPERATOR": yield Token(operators[text], text, None, line)
+            elif kind == "NUMBER": yield Token(TokenType.NUMBER, text, float(text), line)
+            elif kind == "STRING":
+                line += text.count("\n")
+                if len(text) == 1 or text[-1] != '"': ErrorReporter.error("Unterminated string.", line=line)
+                else: yield Token(TokenType.STRING, text, text[1:-1], line)
+            elif kind == "COMMENT": pass
+            elif kind == "SLASH": yield Token(TokenType.SLASH, text, None, line)
+            elif kind == "BLOCK_COMMENT": pos = self.block_comment(pos)
+            else: ErrorReporter.error("Unexpected character.", line=line)
+        self.line = line
+        yield Token(TokenType.EOF, "", None, line)
+
+    def block_comment(self, current: int) -> int:
+        # RegexScanner.block_comment, reading more of the file whenever the walk reaches the end of the buffer
+        self.multi_line_comment_count += 1
+        while True:
+            while current >= len(self.buffer) and self.fill(): pass
+            if current >= len(self.buffer): return len(self.buffer)
+            if self.buffer[current] == '/' or self.multi_line_comment_count == 0: return current
+            slash: int = self.buffer.find('/', current)
+            while slash == -1:
+                # nothing before the last character can end the comment, drop it instead of growing the buffer
+                self.buffer, current = self.buffer[-1:], 0
+                if not self.fill(): return len(self.buffer)
+                slash = self.buffer.find('/', current)
+            if slash - 1 < current or self.buffer[slash - 1] != '*': return slash
+            self.multi_line_comment_count -= 1
+            current = slash + 2 # '*/' and the character after it
+
+class TokenStream:
+    """Indexable view over a token iterator for Parser, which only ever looks at its current token and the
+    ones just before it. Tokens are pulled on demand and the ones far behind are dropped."""
+    KEEP: int = 16 # tokens kept behind the furthest one requested
+
+    def __init__(self, tokens: Iterator[Token]):
+        self.tokens = tokens
+        self.window: list[Token] = []
+        self.start: int = 0 # index of window[0] in the whole stream
+
+    def __getitem__(self, idx: int) -> Token:
+        offset: int = idx - self.start
+        if offset >= len(self.window):
+            if offset > 4 * self.KEEP: # trim in batches so the del stays amortized
+                drop: int = min(offset - self.KEEP, len(self.window) - 1)
+                del self.window[:drop]
+                self.start += drop
+                offset -= drop
+            while offset >= len(self.window):
+                token: Token | None = next(self.tokens, None)
+                self.window.append(token if token is not None else self.window[-1]) # past the end keeps returning EOF
+        if offset < 0: raise IndexError(f"token {idx} is no longer buffered")
+        return self.window[offset]
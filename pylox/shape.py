@@ -0,0 +1,32 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from pylox.lox_class import LoxClass
+    from pylox.lox_function import LoxFunction
+
+class Shape:
+    """Hidden class of a LoxInstance: the class plus the field names in the order they were first set.
+
+    Instances keep their field values in a plain list indexed through the shape, and instances built the same
+    way share one Shape. Adding a field moves an instance along a transition to the child shape, which is
+    created once and reused. Every class has its own root shape, so a shape also pins the receiver's class and
+    property caches can be keyed on the shape alone. Shapes never change once created.
+    """
+    __slots__ = ("klass", "names", "transitions")
+
+    def __init__(self, klass: LoxClass, names: dict[str, int]):
+        self.klass = klass
+        self.names = names # field name -> index into LoxInstance.values
+        self.transitions: dict[str, Shape] = {}
+
+    def resolve(self, name: str) -> tuple[int, Optional[LoxFunction]]: # (field index, -1 if none) and the method fields would shadow
+        idx: int = self.names.get(name, -1)
+        return idx, self.klass.find_method(name) if idx < 0 else None
+
+    def store(self, name: str) -> tuple[int, Shape]: # where a set of name writes to and the shape afterwards
+        idx: Optional[int] = self.names.get(name)
+        if idx is not None: return idx, self
+        shape: Optional[Shape] = self.transitions.get(name)
+        if shape is None: shape = self.transitions[name] = Shape(self.klass, {**self.names, name: len(self.names)})
+        return len(self.names), shape
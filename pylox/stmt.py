@@ -1,10 +1,10 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Protocol, Optional
 from pylox.tokens import Token
 from pylox.expr import Expr, Variable
-from pylox.environment import UnInitValue
+from pylox.environment import UnInitValue, Slot, FrameLayout
 
 class Visitor(Protocol):
 	def visit_Break_Stmt(self, break_arg: Break): ...
@@ -19,51 +19,56 @@ class Visitor(Protocol):
 	def visit_While_Stmt(self, while_arg: While): ...
 
 class Stmt(ABC):
+	__slots__ = ()
 	@abstractmethod
 	def accept(self, visitor: Visitor): ...
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Break(Stmt):
 	
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Break_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Block(Stmt):
 	statements: list[Stmt | None]
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Block_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Class(Stmt):
 	name: Token
 	superclasses: list[Variable]
 	methods: list[Function]
 	class_methods: list[Function]
+	slot: Slot = field(default_factory=Slot)
+	super_slot: Slot = field(default_factory=Slot)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Class_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Expression(Stmt):
 	expression: Expr
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Expression_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Function(Stmt):
 	name: Token
 	params: list[Token]
 	body: list[Stmt | None]
 	is_getter: bool
+	slot: Slot = field(default_factory=Slot)
+	layout: FrameLayout = field(default_factory=FrameLayout)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Function_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class If(Stmt):
 	condition: Expr
 	then_branch: Stmt
@@ -72,14 +77,14 @@ class If(Stmt):
 	def accept(self, visitor: Visitor):
 		return visitor.visit_If_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Print(Stmt):
 	expression: Expr
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Print_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Return(Stmt):
 	keyword: Token
 	value: Optional[Expr]
@@ -87,15 +92,16 @@ class Return(Stmt):
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Return_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class Var(Stmt):
 	name: Token
 	initializer: Expr | UnInitValue
+	slot: Slot = field(default_factory=Slot)
 
 	def accept(self, visitor: Visitor):
 		return visitor.visit_Var_Stmt(self)
 
-@dataclass(frozen=True, eq=False)
+@dataclass(eq=False, slots=True)
 class While(Stmt):
 	condition: Expr
 	body: Stmt
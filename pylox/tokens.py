@@ -1,7 +1,7 @@
 from pylox.tokentype import TokenType
 from dataclasses import dataclass
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Token:
    token_type: TokenType
    lexeme: str
@@ -0,0 +1,494 @@
+from __future__ import annotations
+from typing import Optional
+from pylox.interpreter import Interpreter
+from pylox.expr import Expr
+from pylox.stmt import Stmt
+from pylox.tokens import Token
+from pylox.runtime_error import PyloxRuntimeError, NativeError
+from pylox.error import ErrorReporter
+from pylox.environment import UnInitValue
+from pylox.lox_callable import LoxCallable
+from pylox.natives import NativeFunction, NativeInstance, binary
+from pylox.lox_class import LoxClass
+from pylox.lox_instance import LoxInstance
+from pylox.memo import MemoizedFunction, MISS
+from pylox.chunk import OpCode, FunctionProto, ClassProto
+from pylox.compiler import Compiler
+
+# Runtime environments are plain lists: [enclosing, value_0, value_1, ...]. This is the same chain the
+# tree-walker builds out of Environment objects, minus the per-access method calls.
+
+MAX_DEPTH: int = 250_000 # default limit on nested Lox calls, frames live on the heap (roughly 300 bytes each) so this only stops runaway recursion
+UNDEFINED: UnInitValue = UnInitValue() # globals.get() default, shares the class check with uninitialized variables
+NO_RECEIVER: object = object() # receiver slot below a callee that GET_METHOD couldn't call as a method
+MEMO_CODE: list[int] = [OpCode.MEMO_STORE.value, OpCode.RETURN.value] # code of the frame a memoized call returns through
+
+class VMFunction(LoxCallable):
+    __hash__ = None # like the tree-walker's LoxFunction, so memo() runs calls with a function argument uncached on every engine
+
+    def __init__(self, proto: FunctionProto, env: list, vm: VM):
+        self.proto = proto
+        self.env = env
+        self.vm = vm
+
+    def bind(self, instance: LoxInstance) -> VMFunction:
+        return VMFunction(self.proto, [self.env, instance], self.vm)
+
+    def call(self, interpreter: Interpreter, arguments: list[object]) -> object: # entry point for natives and LoxClass.call
+        return self.vm.run(self, arguments)
+
+    def arity(self) -> int:
+        return self.proto.arity
+
+    def __str__(self) -> str:
+        if self.proto.name is None: return "<lambda fn>"
+        return f"<fn {self.proto.name.lexeme}>"
+
+class VM:
+    def __init__(self, interpreter: Interpreter, max_depth: int = MAX_DEPTH):
+        self.interpreter = interpreter # provides natives, C3 mro and stringify
+        self.max_depth = max_depth # frames all nested run() calls together may hold before "Stack overflow."
+        self.depth: int = 0 # frames held by the run() calls a native or other python callable re-entered the vm from
+        self.globals: dict[str, object] = {}
+        for name, idx in interpreter.global_idxs.items(): self.globals[name] = interpreter.globals.get_at(0, name, idx)
+
+    def compile(self, statements: list[Stmt]) -> FunctionProto:
+        return Compiler(self.interpreter).compile(statements)
+
+    def interpret(self, statements: list[Stmt]) -> None:
+        self.run_script(self.compile(statements))
+
+    def run_script(self, proto: FunctionProto) -> None:
+        try: self.run(VMFunction(proto, [None], self), [])
+        except PyloxRuntimeError as error: ErrorReporter.runtime_error(error)
+
+    def evaluate(self, expr: Optional[Expr]) -> object:
+        if expr is None: return None
+        return self.run(VMFunction(Compiler(self.interpreter).compile_expression(expr), [None], self), [])
+
+    def stringify(self, obj: object) -> str:
+        return self.interpreter.stringify(obj)
+
+    def run(self, function: VMFunction, arguments: list[object]) -> object:
+        # callers check arity before getting here, like LoxCallable.call in the tree-walker
+        outer: int = self.depth
+        try: return self.dispatch(function, arguments, outer)
+        finally: self.depth = outer
+
+    def dispatch(self, function: VMFunction, arguments: list[object], outer: int) -> object:
+        # a run nested in others (python code calling back into Lox) only gets what's left of max_depth, and before
+        # calling out to python a run records in self.depth how many frames it holds. RecursionError from running
+        # out either way is turned into "Stack overflow." at the call site that went through python.
+        max_depth: int = self.max_depth - outer - 1 # frames this run may push, its own entry call counts as one
+        if max_depth < 0: raise RecursionError
+        interpreter: Interpreter = self.interpreter
+        globals: dict[str, object] = self.globals
+        stack: list[object] = []
+        push = stack.append
+        pop = stack.pop
+        frames: list[tuple] = [] # saved (function, code, constants, tokens, ip, env) of callers
+        env: list = [function.env, *arguments]
+        chunk = function.proto.chunk
+        code: list[int] = chunk.code
+        constants: list[object] = chunk.constants
+        tokens: dict[int, Token] = chunk.tokens
+        ip: int = 0
+
+        CONSTANT = OpCode.CONSTANT.value; NIL = OpCode.NIL.value; TRUE = OpCode.TRUE.value; FALSE = OpCode.FALSE.value; POP = OpCode.POP.value
+        GET_LOCAL0 = OpCode.GET_LOCAL0.value; GET_LOCAL1 = OpCode.GET_LOCAL1.value; GET_LOCAL = OpCode.GET_LOCAL.value
+        SET_LOCAL = OpCode.SET_LOCAL.value; DEFINE_LOCAL = OpCode.DEFINE_LOCAL.value
+        GET_GLOBAL = OpCode.GET_GLOBAL.value; SET_GLOBAL = OpCode.SET_GLOBAL.value; DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+        PUSH_ENV = OpCode.PUSH_ENV.value; POP_ENV = OpCode.POP_ENV.value
+        ADD = OpCode.ADD.value; SUBTRACT = OpCode.SUBTRACT.value; MULTIPLY = OpCode.MULTIPLY.value; DIVIDE = OpCode.DIVIDE.value
+        GREATER = OpCode.GREATER.value; GREATER_EQUAL = OpCode.GREATER_EQUAL.value; LESS = OpCode.LESS.value; LESS_EQUAL = OpCode.LESS_EQUAL.value
+        EQUAL = OpCode.EQUAL.value; NOT_EQUAL = OpCode.NOT_EQUAL.value; NEGATE = OpCode.NEGATE.value; NOT = OpCode.NOT.value
+        JUMP = OpCode.JUMP.value; JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+        JUMP_IF_FALSE_KEEP = OpCode.JUMP_IF_FALSE_KEEP.value; JUMP_IF_TRUE_KEEP = OpCode.JUMP_IF_TRUE_KEEP.value
+        CALL = OpCode.CALL.value; CLOSURE = OpCode.CLOSURE.value; RETURN = OpCode.RETURN.value; RETURN_THIS = OpCode.RETURN_THIS.value; MEMO_STORE = OpCode.MEMO_STORE.value
+        GET_METHOD = OpCode.GET_METHOD.value; CALL_METHOD = OpCode.CALL_METHOD.value
+        CLASS = OpCode.CLASS.value; INHERIT = OpCode.INHERIT.value
+        GET_PROPERTY = OpCode.GET_PROPERTY.value; SET_PROPERTY = OpCode.SET_PROPERTY.value; CHECK_INSTANCE = OpCode.CHECK_INSTANCE.value
+        GET_SUPER = OpCode.GET_SUPER.value; GET_INNER = OpCode.GET_INNER.value
+        GET_INDEX = OpCode.GET_INDEX.value; SET_INDEX = OpCode.SET_INDEX.value
+        PRINT = OpCode.PRINT.value
+        STORE_LOCAL = OpCode.STORE_LOCAL.value; STORE_GLOBAL = OpCode.STORE_GLOBAL.value
+        ADD_CONSTANT = OpCode.ADD_CONSTANT.value; SUBTRACT_CONSTANT = OpCode.SUBTRACT_CONSTANT.value; LESS_CONSTANT = OpCode.LESS_CONSTANT.value
+
+        while True:
+            op: int = code[ip]
+            ip += 1
+            # ordered roughly by how often each instruction runs in loop heavy code
+            if op == GET_LOCAL0:
+                push(env[code[ip] + 1])
+                ip += 1
+            elif op == GET_LOCAL1:
+                push(env[0][code[ip] + 1])
+                ip += 1
+            elif op == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == GET_GLOBAL:
+                value = globals.get(constants[code[ip]], UNDEFINED)
+                ip += 1
+                if value.__class__ is UnInitValue: # also catches UNDEFINED
+                    name: Token = tokens[ip - 2]
+                    if name.lexeme not in globals: raise PyloxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+                    raise PyloxRuntimeError(name, f"Variable '{name.lexeme}' accessed before its initialized or assigned.")
+                push(value)
+            elif op == LESS_CONSTANT:
+                left = stack[-1]
+                if left.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, constants[code[ip]], "Operands must be numbers.")
+                else: stack[-1] = left < constants[code[ip]]
+                ip += 1
+            elif op == ADD_CONSTANT:
+                left = stack[-1]
+                right = constants[code[ip]]
+                ip += 1
+                if left.__class__ is float: stack[-1] = left + right
+                elif isinstance(left, str): stack[-1] = left + str(right)[:-2]
+                else: stack[-1] = binary(tokens[ip - 2], left, right, "Operands must be numbers or strings.")
+            elif op == STORE_LOCAL:
+                depth: int = code[ip]
+                target: list = env
+                while depth:
+                    target = target[0]
+                    depth -= 1
+                target[code[ip + 1] + 1] = pop()
+                ip += 2
+            elif op == SUBTRACT_CONSTANT:
+                left = stack[-1]
+                if left.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, constants[code[ip]], "Operands must be numbers.")
+                else: stack[-1] = left - constants[code[ip]]
+                ip += 1
+            elif op == STORE_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals: raise PyloxRuntimeError(tokens[ip - 2], f"Undefined variable '{name}'.")
+                globals[name] = pop()
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ is not float or right.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, right, "Operands must be numbers.")
+                else: stack[-1] = left < right
+            elif op == JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False: ip = code[ip]
+                else: ip += 1
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ is float and right.__class__ is float: stack[-1] = left + right
+                elif isinstance(left, str) or isinstance(right, str):
+                    stack[-1] = (str(left)[:-2] if isinstance(left, float) else str(left)) + (str(right)[:-2] if isinstance(right, float) else str(right))
+                else: stack[-1] = binary(tokens[ip - 1], left, right, "Operands must be numbers or strings.")
+            elif op == SET_LOCAL:
+                depth: int = code[ip]
+                target: list = env
+                while depth:
+                    target = target[0]
+                    depth -= 1
+                target[code[ip + 1] + 1] = stack[-1]
+                ip += 2
+            elif op == POP:
+                pop()
+            elif op == JUMP:
+                ip = code[ip]
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ is not float or right.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, right, "Operands must be numbers.")
+                else: stack[-1] = left - right
+            elif op == CALL:
+                argc: int = code[ip]
+                ip += 1
+                callee = stack[-argc - 1]
+                if callee.__class__ is VMFunction:
+                    proto: FunctionProto = callee.proto
+                    if argc != proto.arity: raise PyloxRuntimeError(tokens[ip - 2], f"Expected {proto.arity} arguments but got {argc}.")
+                    if len(frames) >= max_depth: raise PyloxRuntimeError(tokens[ip - 2], "Stack overflow.")
+                    frames.append((function, code, constants, tokens, ip, env))
+                    env = [callee.env]
+                    if argc: env.extend(stack[-argc:])
+                    del stack[-argc - 1:]
+                    function = callee
+                    chunk = proto.chunk
+                    code, constants, tokens, ip = chunk.code, chunk.constants, chunk.tokens, 0
+                elif callee.__class__ is NativeFunction: # straight into python
+                    if argc != callee.params: raise PyloxRuntimeError(tokens[ip - 2], f"Expected {callee.params} arguments but got {argc}.")
+                    arguments = stack[len(stack) - argc:]
+                    del stack[-argc - 1:]
+                    try: push(callee.function(*arguments))
+                    except NativeError as error: raise PyloxRuntimeError(tokens[ip - 2], str(error)) from None
+                elif isinstance(callee, LoxClass):
+                    instance: LoxInstance = LoxInstance(callee)
+                    initializer = callee.initializer
+                    if initializer is None:
+                        if argc != 0: raise PyloxRuntimeError(tokens[ip - 2], f"Expected 0 arguments but got {argc}.")
+                        stack[-1] = instance
+                    elif isinstance(initializer, VMFunction):
+                        if argc != initializer.proto.arity: raise PyloxRuntimeError(tokens[ip - 2], f"Expected {initializer.proto.arity} arguments but got {argc}.")
+                        if len(frames) >= max_depth: raise PyloxRuntimeError(tokens[ip - 2], "Stack overflow.")
+                        frames.append((function, code, constants, tokens, ip, env))
+                        function = initializer.bind(instance)
+                        env = [function.env]
+                        if argc: env.extend(stack[-argc:])
+                        del stack[-argc - 1:]
+                        chunk = initializer.proto.chunk
+                        code, constants, tokens, ip = chunk.code, chunk.constants, chunk.tokens, 0
+                    else:
+                        arguments = stack[len(stack) - argc:]
+                        del stack[-argc - 1:]
+                        self.depth = self.max_depth - max_depth + len(frames) # outer + 1 + frames held, MEMO_CODE frames aside
+                        try: push(callee.call(interpreter, arguments))
+                        except RecursionError: raise PyloxRuntimeError(tokens[ip - 2], "Stack overflow.") from None
+                elif callee.__class__ is MemoizedFunction and callee.function.__class__ is VMFunction:
+                    # a hit is pushed right away, a miss runs on the heap frames like any call and returns through a
+                    # MEMO_CODE frame that stores the result, so memoized recursion isn't bounded by the python stack
+                    target: VMFunction = callee.function
+                    proto = target.proto
+                    if argc != proto.arity: raise PyloxRuntimeError(tokens[ip - 2], f"Expected {proto.arity} arguments but got {argc}.")
+                    arguments = stack[len(stack) - argc:]
+                    key, value = callee.lookup(arguments)
+                    del stack[-argc - 1:]
+                    if value is not MISS: push(value)
+                    else:
+                        if len(frames) >= max_depth: raise PyloxRuntimeError(tokens[ip - 2], "Stack overflow.")
+                        frames.append((function, code, constants, tokens, ip, env))
+                        if key is not None:
+                            frames.append((target, MEMO_CODE, (callee, key), {}, 0, env))
+                            max_depth += 1 # the MEMO_CODE frame doesn't count against the limit, MEMO_STORE takes it back
+                        env = [target.env, *arguments]
+                        function = target
+                        chunk = proto.chunk
+                        code, constants, tokens, ip = chunk.code, chunk.constants, chunk.tokens, 0
+                elif isinstance(callee, LoxCallable):
+                    if argc != callee.arity(): raise PyloxRuntimeError(tokens[ip - 2], f"Expected {callee.arity()} arguments but got {argc}.")
+                    arguments = stack[len(stack) - argc:]
+                    del stack[-argc - 1:]
+                    self.depth = self.max_depth - max_depth + len(frames) # outer + 1 + frames held, MEMO_CODE frames aside
+                    try: push(callee.call(interpreter, arguments))
+                    except RecursionError: raise PyloxRuntimeError(tokens[ip - 2], "Stack overflow.") from None
+                    except NativeError as error: raise PyloxRuntimeError(tokens[ip - 2], str(error)) from None
+                else: raise PyloxRuntimeError(tokens[ip - 2], "Can only call functions and classes.")
+            elif op == GET_METHOD: # leaves [obj, method] and skips the GET_PROPERTY after it, else [NO_RECEIVER, obj] for that GET_PROPERTY
+                obj = stack[-1]
+                method = None
+                if obj.__class__ is LoxInstance:
+                    cache = constants[code[ip + 2]]
+                    shape = obj.shape
+                    method = cache.target if cache.shape is shape else cache.lookup(shape, constants[code[ip + 1]].lexeme)[1]
+                if method is not None and not method.proto.is_getter and not method.proto.is_initializer: # initializers need RETURN_THIS's bound env
+                    push(method)
+                    ip += 3
+                else:
+                    stack[-1] = NO_RECEIVER
+                    push(obj)
+            elif op == CALL_METHOD:
+                argc = code[ip]
+                ip += 1
+                callee = stack[-argc - 1]
+                if callee.__class__ is VMFunction:
+                    proto = callee.proto
+                    if argc != proto.arity: raise PyloxRuntimeError(tokens[ip - 2], f"Expected {proto.arity} arguments but got {argc}.")
+                    receiver = stack[-argc - 2]
+                    if len(frames) >= max_depth: raise PyloxRuntimeError(tokens[ip - 2], "Stack overflow.")
+                    frames.append((function, code, constants, tokens, ip, env))
+                    env = [callee.env if receiver is NO_RECEIVER else [callee.env, receiver]]
+                    if argc: env.extend(stack[-argc:])
+                    del stack[-argc - 2:]
+                    function = callee
+                    chunk = proto.chunk
+                    code, constants, tokens, ip = chunk.code, chunk.constants, chunk.tokens, 0
+                else: # a class or native read from a field
+                    if not isinstance(callee, LoxCallable): raise PyloxRuntimeError(tokens[ip - 2], "Can only call functions and classes.")
+                    if argc != callee.arity(): raise PyloxRuntimeError(tokens[ip - 2], f"Expected {callee.arity()} arguments but got {argc}.")
+                    arguments = stack[len(stack) - argc:]
+                    del stack[-argc - 2:]
+                    self.depth = self.max_depth - max_depth + len(frames) # outer + 1 + frames held, MEMO_CODE frames aside
+                    try: push(callee.function(*arguments) if callee.__class__ is NativeFunction else callee.call(interpreter, arguments))
+                    except RecursionError: raise PyloxRuntimeError(tokens[ip - 2], "Stack overflow.") from None
+                    except NativeError as error: raise PyloxRuntimeError(tokens[ip - 2], str(error)) from None
+            elif op == RETURN:
+                value = pop()
+                if not frames: return value
+                function, code, constants, tokens, ip, env = frames.pop()
+                push(value)
+            elif op == GET_LOCAL:
+                depth = code[ip]
+                target = env
+                while depth:
+                    target = target[0]
+                    depth -= 1
+                push(target[code[ip + 1] + 1])
+                ip += 2
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ is not float or right.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, right, "Operands must be numbers.")
+                else: stack[-1] = left * right
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ is not float or right.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, right, "Operands must be numbers.")
+                elif right == 0: raise PyloxRuntimeError(tokens[ip - 1], "Cannot divide by zero.")
+                else: stack[-1] = left / right
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ is not float or right.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, right, "Operands must be numbers.")
+                else: stack[-1] = left > right
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ is not float or right.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, right, "Operands must be numbers.")
+                else: stack[-1] = left >= right
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ is not float or right.__class__ is not float: stack[-1] = binary(tokens[ip - 1], left, right, "Operands must be numbers.")
+                else: stack[-1] = left <= right
+            elif op == EQUAL:
+                right = pop()
+                left = stack[-1]
+                stack[-1] = (left is None and right is None) or (left is not None and left == right)
+            elif op == NOT_EQUAL:
+                right = pop()
+                left = stack[-1]
+                stack[-1] = not ((left is None and right is None) or (left is not None and left == right))
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == NEGATE:
+                value = stack[-1]
+                if value.__class__ is not float: raise PyloxRuntimeError(tokens[ip - 1], "Operand must be a number.")
+                stack[-1] = -value
+            elif op == JUMP_IF_FALSE_KEEP:
+                value = stack[-1]
+                if value is None or value is False: ip = code[ip]
+                else: ip += 1
+            elif op == JUMP_IF_TRUE_KEEP:
+                value = stack[-1]
+                if value is None or value is False: ip += 1
+                else: ip = code[ip]
+            elif op == NIL:
+                push(None)
+            elif op == TRUE:
+                push(True)
+            elif op == FALSE:
+                push(False)
+            elif op == GET_PROPERTY:
+                name = constants[code[ip]]
+                cache = constants[code[ip + 1]]
+                ip += 2
+                obj = stack[-1]
+                if obj.__class__ is LoxInstance and cache.shape is obj.shape and cache.index >= 0: stack[-1] = obj.values[cache.index] # monomorphic field read
+                else:
+                    if not isinstance(obj, LoxInstance): raise PyloxRuntimeError(name, "Only instances have properties.")
+                    method = obj.get_method(name, cache) if obj.__class__ is LoxInstance else None
+                    if method is not None and method.proto.is_getter and not method.proto.is_initializer: value, this = method, obj # no bound getter needed
+                    else: value, this = obj.get(name, cache), None
+                    if value.__class__ is VMFunction and value.proto.is_getter: # run the getter as a zero argument call
+                        if len(frames) >= max_depth: raise PyloxRuntimeError(name, "Stack overflow.")
+                        frames.append((function, code, constants, tokens, ip, env))
+                        pop()
+                        function = value
+                        env = [value.env if this is None else [value.env, this]]
+                        chunk = value.proto.chunk
+                        code, constants, tokens, ip = chunk.code, chunk.constants, chunk.tokens, 0
+                    else: stack[-1] = value
+            elif op == SET_PROPERTY:
+                name = constants[code[ip]]
+                cache = constants[code[ip + 1]]
+                ip += 2
+                value = pop()
+                obj = stack[-1]
+                if not isinstance(obj, LoxInstance): raise PyloxRuntimeError(name, "Only instances have fields.")
+                obj.set(name, value, cache)
+                stack[-1] = value
+            elif op == GET_INDEX:
+                index = pop()
+                obj = stack[-1]
+                if not isinstance(obj, NativeInstance): raise PyloxRuntimeError(tokens[ip - 1], "Only lists and maps can be indexed.")
+                try: stack[-1] = obj.index_get(index)
+                except NativeError as error: raise PyloxRuntimeError(tokens[ip - 1], str(error)) from None
+            elif op == SET_INDEX:
+                value = pop()
+                index = pop()
+                obj = stack[-1]
+                if not isinstance(obj, NativeInstance): raise PyloxRuntimeError(tokens[ip - 1], "Only lists and maps can be indexed.")
+                try: obj.index_set(index, value)
+                except NativeError as error: raise PyloxRuntimeError(tokens[ip - 1], str(error)) from None
+                stack[-1] = value
+            elif op == CHECK_INSTANCE:
+                if not isinstance(stack[-1], LoxInstance): raise PyloxRuntimeError(tokens[ip - 1], "Only instances have fields.")
+            elif op == DEFINE_LOCAL:
+                env.append(pop())
+            elif op == DEFINE_GLOBAL:
+                globals[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals: raise PyloxRuntimeError(tokens[ip - 2], f"Undefined variable '{name}'.")
+                globals[name] = stack[-1]
+            elif op == PUSH_ENV:
+                env = [env]
+            elif op == POP_ENV:
+                env = env[0]
+            elif op == PRINT:
+                print(interpreter.stringify(pop()))
+            elif op == CLOSURE:
+                push(VMFunction(constants[code[ip]], env, self))
+                ip += 1
+            elif op == MEMO_STORE: # constants is (memoized function, key) in a MEMO_CODE frame, the result is on the stack
+                constants[0].store(constants[1], stack[-1])
+                max_depth -= 1
+            elif op == RETURN_THIS:
+                value = function.env[1] # initializers are always bound, 'this' is the only value of the enclosing environment
+                if not frames: return value
+                function, code, constants, tokens, ip, env = frames.pop()
+                push(value)
+            elif op == INHERIT:
+                count: int = code[ip]
+                ip += 1
+                superclasses: list[object] = stack[len(stack) - count:]
+                del stack[-count:]
+                if not all(isinstance(sc, LoxClass) for sc in superclasses): raise PyloxRuntimeError(tokens[ip - 2], "Superclass must be a class.")
+                push(superclasses)
+            elif op == CLASS:
+                class_proto: ClassProto = constants[code[ip]]
+                ip += 1
+                class_method_count: int = len(class_proto.class_method_names)
+                method_count: int = len(class_proto.method_names)
+                class_methods: list[VMFunction] = stack[len(stack) - class_method_count:] if class_method_count else []
+                if class_method_count: del stack[-class_method_count:]
+                methods: list[VMFunction] = stack[len(stack) - method_count:] if method_count else []
+                if method_count: del stack[-method_count:]
+                klass: LoxClass = LoxClass(class_proto.name.lexeme, env[1] if class_proto.has_superclass else [], dict(zip(class_proto.method_names, methods)), [])
+                klass.fields = dict(zip(class_proto.class_method_names, class_methods))
+                klass.mro = interpreter.mro(klass, class_proto.name)
+                klass.build_vtables()
+                push(klass)
+            elif op == GET_SUPER:
+                depth, unique_idx = code[ip], code[ip + 1]
+                name = constants[code[ip + 2]]
+                ip += 3
+                target = env
+                for _ in range(depth - 1): target = target[0]
+                instance = target[1] # 'this' sits right below the environment holding the superclasses
+                method = None
+                for sc in target[0][unique_idx + 1]:
+                    if (method := sc.find_method(name.lexeme)) is not None: break
+                if method is None: raise PyloxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+                push(method.bind(instance))
+            elif op == GET_INNER:
+                depth = code[ip]
+                name = constants[code[ip + 1]]
+                ip += 2
+                target = env
+                for _ in range(depth): target = target[0]
+                instance = target[1]
+                method = instance.klass.find_method(name.lexeme, ignore_first=True)
+                if method is None: raise PyloxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+                push(method.bind(instance))
+            else: raise RuntimeError(f"Unknown opcode {op}.")
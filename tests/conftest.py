@@ -0,0 +1,17 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable
+import pytest
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+
+@pytest.fixture
+def lox(tmp_path: Path) -> Callable[..., tuple[str, int]]:
+    """Runs Lox source as a script file with the given flags, giving back (stdout without the Eval: header, exit code)."""
+    def run(source: str, *flags: str) -> tuple[str, int]:
+        script: Path = tmp_path / "script.lox"
+        script.write_text(source, encoding="utf-8")
+        result = subprocess.run([sys.executable, "-m", "pylox.pylox", "--no-cache", *flags, str(script)], cwd=ROOT, capture_output=True, text=True, timeout=300)
+        return result.stdout.removeprefix("\nEval:\n"), result.returncode
+    return run
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+# __loxcache__ behaviour seen from the command line: a second run hits the entry the first one stored, editing
+# the script replaces its entry, and the optimized and plain variants keep one entry each.
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+SCRIPT: str = "fun f(n) { return n * 2; }\nvar x = 1 + 2;\nprint f(x);\n"
+
+def run(script: Path, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "pylox.pylox", *flags, str(script)], cwd=ROOT, capture_output=True, text=True, timeout=120)
+
+def entries(script: Path, variant: str = "*") -> list[Path]:
+    return sorted((script.parent / "__loxcache__").glob(f"{script.name}.{variant}.*.pickle"))
+
+@pytest.fixture
+def script(tmp_path: Path) -> Path:
+    path: Path = tmp_path / "cached.lox"
+    path.write_text(SCRIPT, encoding="utf-8")
+    return path
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_second_run_hits(script: Path, engine: str):
+    first = run(script, f"--engine={engine}")
+    [entry] = entries(script)
+    stored: int = entry.stat().st_mtime_ns
+    second = run(script, f"--engine={engine}")
+    assert (second.stdout, second.returncode) == (first.stdout, first.returncode) == ("\nEval:\n6\n", 0)
+    if engine != "vm": assert entry.stat().st_mtime_ns == stored # the vm adds its bytecode to a tree-walker entry once
+    assert entries(script) == [entry]
+
+def test_edit_replaces_stale_entry(script: Path):
+    run(script)
+    [old] = entries(script)
+    script.write_text(SCRIPT.replace("n * 2", "n * 3"), encoding="utf-8")
+    assert run(script).stdout == "\nEval:\n9\n"
+    [new] = entries(script)
+    assert new != old
+
+def test_optimized_and_plain_entries_coexist(script: Path):
+    run(script)
+    assert "[optimizer]" in run(script, "--optimize").stderr
+    assert len(entries(script, "std")) == 1 and len(entries(script, "opt")) == 1
+    plain = run(script)
+    optimized = run(script, "--optimize")
+    assert plain.stdout == optimized.stdout == "\nEval:\n6\n"
+    assert "[optimizer]" not in optimized.stderr # a hit, the optimizer didn't run again
+    assert len(entries(script, "std")) == 1 and len(entries(script, "opt")) == 1
+
+def test_no_cache_stores_nothing(script: Path):
+    assert run(script, "--no-cache").stdout == "\nEval:\n6\n"
+    assert entries(script) == []
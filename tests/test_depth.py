@@ -0,0 +1,47 @@
+import pytest
+
+# Call depth behaviour that differs per engine. The tree-walker runs tail calls in its caller's activation, so
+# they never run out of stack; the vm keeps frames on the heap up to --max-depth; the closure engine is bounded
+# by the python stack. Running out must always end in a Lox "Stack overflow." error, never a python traceback.
+
+TAIL_CALLS: str = """
+fun count(n, acc) { if (n == 0) return acc; return count(n - 1, acc + 1); }
+print count(200000, 0);
+fun even(n) { if (n == 0) return true; return odd(n - 1); }
+fun odd(n) { if (n == 0) return false; return even(n - 1); }
+print even(100001);
+class W { init(n) { this.n = n; } step(k) { if (k == 0) return this.n; this.n = this.n + 1; return this.step(k - 1); } }
+print W(0).step(30000);
+fun mk(n) { return fun(k) { if (k == 0) return n; return mk(n + 1)(k - 1); }; }
+print mk(0)(10);
+"""
+
+@pytest.mark.parametrize("engine", ["tree", "vm"])
+def test_deep_tail_calls(lox, engine: str):
+    assert lox(TAIL_CALLS, f"--engine={engine}") == ("200000\nfalse\n30000\n10\n", 0)
+
+def test_deep_tail_calls_overflow_cleanly_in_closure_engine(lox):
+    assert lox(TAIL_CALLS, "--engine=closure") == ("Stack overflow.\n[line 1]\n", 70)
+
+def test_tail_position_keeps_initializer_result(lox): # 'return this.init()' inside a method isn't a plain tail call
+    source: str = "class W { init(n) { this.n = n; } again() { return this.init(7); } }\nprint W(1).again().n;\n"
+    for engine in ("tree", "vm", "closure"): assert lox(source, f"--engine={engine}") == ("7\n", 0)
+
+DOWN: str = "fun down(n) { if (n == 0) return 0; return 1 + down(n - 1); }\n"
+
+def test_vm_max_depth(lox):
+    assert lox(DOWN + "print down(90);\n", "--engine=vm", "--max-depth=100") == ("90\n", 0)
+    assert lox(DOWN + "print down(200);\n", "--engine=vm", "--max-depth=100") == ("Stack overflow.\n[line 0]\n", 70)
+
+def test_vm_max_depth_counts_nested_runs(lox): # a memoized function read from a field goes through python, every level is a run() nested in the last
+    source: str = "class M {}\nvar m = M();\nfun fib(n) { if (n < 2) return n; return m.fib(n - 1) + m.fib(n - 2); }\nm.fib = memo(fib);\nprint m.fib(40);\nprint m.fib(200);\n"
+    assert lox(source, "--engine=vm", "--max-depth=100") == ("102334155\nStack overflow.\n[line 2]\n", 70)
+
+DEEP_MEMO: str = "fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }\nfib = memo(fib);\nprint fib(3000);\nprint fib.misses;\n"
+
+def test_deep_memoized_recursion_in_vm(lox): # misses run on the vm's heap frames, not through python
+    assert lox(DEEP_MEMO, "--engine=vm") == ("inf\n3001\n", 0)
+
+@pytest.mark.parametrize("engine", ["tree", "closure"])
+def test_deep_memoized_recursion_overflows_cleanly(lox, engine: str):
+    assert lox(DEEP_MEMO, f"--engine={engine}") == ("Stack overflow.\n[line 0]\n", 70)
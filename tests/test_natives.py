@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+# The default native modules give every script its builtins without costing more than standard library imports at
+# startup. --natives adds modules, by their short name for the ones in pylox.natives or a full module path.
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+EXTRA: str = "from pylox.natives import native\n\n@native('twice', 1)\ndef twice(x: object) -> object: return x * 2\n"
+
+def pylox(tmp_path: Path, source: str, *flags: str) -> subprocess.CompletedProcess: # runs with tmp_path importable
+    script: Path = tmp_path / "script.lox"
+    script.write_text(source, encoding="utf-8")
+    env: dict[str, str] = {**os.environ, "PYTHONPATH": str(tmp_path)}
+    return subprocess.run([sys.executable, "-m", "pylox.pylox", "--no-cache", *flags, str(script)], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+
+def test_startup_imports_no_numpy():
+    code: str = "import sys, pylox.interpreter; print(sorted(m for m in sys.modules if m.startswith('pylox.natives') or m == 'numpy'))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.stdout == "['pylox.natives', 'pylox.natives.containers', 'pylox.natives.core', 'pylox.natives.numeric', 'pylox.natives.strings', 'pylox.natives.vectors']\n"
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_default_natives(lox, engine: str):
+    source: str = "print clock() > 0;\nprint sqrt(16);\nprint len(\"abc\");\nprint List();\nprint Map();\nprint StringBuilder().append(1).toString();\nprint FloatArray(2);\n"
+    assert lox(source, f"--engine={engine}") == ("true\n4\n3\n[]\n{}\n1\nFloatArray[0, 0]\n", 0)
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_natives_on_request(tmp_path: Path, engine: str):
+    (tmp_path / "extra").mkdir()
+    (tmp_path / "extra" / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "extra" / "natives.py").write_text(EXTRA, encoding="utf-8")
+    source: str = "print twice(21);\n"
+    assert pylox(tmp_path, source, f"--engine={engine}").stdout == "\nEval:\nUndefined variable 'twice'.\n[line 0]\n"
+    assert pylox(tmp_path, source, f"--engine={engine}", "--natives=extra.natives").stdout == "\nEval:\n42\n"
+    assert pylox(tmp_path, source, f"--engine={engine}", "--natives=numeric,extra.natives").stdout == "\nEval:\n42\n"
+
+def test_unknown_natives_module(tmp_path: Path):
+    result = pylox(tmp_path, "print 1;\n", "--natives=bogus")
+    assert result.returncode == 64 and result.stdout.startswith("Usage: pylox ")
+    assert result.stderr.startswith("pylox: --natives: ") and "pylox.natives.bogus" in result.stderr
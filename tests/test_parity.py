@@ -0,0 +1,31 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+# Every script in corpus/ runs under each engine and must print exactly what corpus/<name>.out holds: stdout
+# followed by an "[exit N]" line. The tree-walker is the reference, the other engines only count if they agree.
+# --optimize must not change what a script prints, the optimizer reports itself on stderr only. A first line of
+# "// flags: ..." passes more flags to every run of that script, e.g. a --max-depth it tests.
+# Regenerate an expectation with: python -m pylox.pylox --no-cache [flags] tests/corpus/<name>.lox
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+CORPUS: Path = Path(__file__).resolve().parent / "corpus"
+ENGINES: tuple[str, ...] = ("tree", "vm", "closure")
+
+def run(script: Path, *flags: str) -> str:
+    result = subprocess.run([sys.executable, "-m", "pylox.pylox", "--no-cache", *flags, str(script)], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    return f"{result.stdout}[exit {result.returncode}]\n"
+
+def flags(script: Path) -> list[str]:
+    first: str = script.read_text(encoding="utf-8").partition("\n")[0]
+    return first.removeprefix("// flags:").split() if first.startswith("// flags:") else []
+
+def expected(script: Path) -> str:
+    return script.with_suffix(".out").read_text(encoding="utf-8")
+
+@pytest.mark.parametrize("optimize", [False, True], ids=["plain", "optimized"])
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("script", sorted(CORPUS.glob("*.lox")), ids=lambda script: script.stem)
+def test_corpus(script: Path, engine: str, optimize: bool):
+    assert run(script, *flags(script), f"--engine={engine}", *(["--optimize"] if optimize else [])) == expected(script)
@@ -0,0 +1,39 @@
+import io
+from pathlib import Path
+import pytest
+from pylox.scanner import Scanner, RegexScanner, StreamingScanner
+from pylox.tokens import Token
+from pylox.error import ErrorReporter
+
+# RegexScanner and StreamingScanner replace the char at a time Scanner, so every source must give the same
+# tokens, lines and error output from all three. Streaming runs with tiny chunks to put lexemes across reads.
+
+CORPUS: Path = Path(__file__).resolve().parent / "corpus"
+SNIPPETS: dict[str, str] = {
+    "numbers": "1 1.5 1. .5 12.25.3 007",
+    "operators": "!= == <= >= ! = < > ( ) { } [ ] , . - + ; ? : * /",
+    "strings": 'print "a"; "multi\nline" "";',
+    "unterminated_string": 'print "never closed',
+    "line_comment": "a // b c\nd",
+    "block_comment": "a /* b\n c */ d",
+    "block_comment_early_slash": "a /* b / c */ d",
+    "block_comment_at_end": "a /* b */",
+    "unclosed_block_comment": "a /* b",
+    "unexpected_characters": "var @ = #1;",
+    "keywords": "and class else false for fun if nil or print return super this true var while break classy",
+}
+
+def scan(scanner: type[Scanner], src: str, capsys: pytest.CaptureFixture) -> tuple[list[Token], str]:
+    if scanner is StreamingScanner: tokens: list[Token] = StreamingScanner(io.StringIO(src)).scan_tokens()
+    else: tokens = scanner(src).scan_tokens()
+    ErrorReporter.had_error = False
+    return tokens, capsys.readouterr().out
+
+SOURCES: list[tuple[str, str]] = [(name, src) for name, src in SNIPPETS.items()]
+SOURCES += [(script.stem, script.read_text(encoding="utf-8")) for script in sorted(CORPUS.glob("*.lox"))]
+
+@pytest.mark.parametrize("scanner", [RegexScanner, StreamingScanner])
+@pytest.mark.parametrize("src", [src for _, src in SOURCES], ids=[name for name, _ in SOURCES])
+def test_same_tokens_as_scanner(scanner: type[Scanner], src: str, capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(StreamingScanner, "CHUNK_SIZE", 7)
+    assert scan(scanner, src, capsys) == scan(Scanner, src, capsys)
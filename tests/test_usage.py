@@ -0,0 +1,15 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+# Bad command lines exit 64 with the usage line on stdout and what was wrong with them on stderr.
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+
+@pytest.mark.parametrize("flag, complaint", [("--engine=foo", "--engine"), ("--max-depth=abc", "--max-depth"), ("--bogus", "--bogus")])
+def test_usage_error_names_the_argument(flag: str, complaint: str):
+    result = subprocess.run([sys.executable, "-m", "pylox.pylox", flag], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 64
+    assert result.stdout.startswith("Usage: pylox ")
+    assert result.stderr.startswith("pylox: ") and complaint in result.stderr
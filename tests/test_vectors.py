@@ -0,0 +1,61 @@
+import subprocess
+import sys
+from array import array
+from pathlib import Path
+import pytest
+from pylox.natives import vectors
+from pylox.natives.vectors import FloatArray
+from pylox.runtime_error import NativeError
+from pylox.tokentype import TokenType
+
+# FloatArray has a numpy path and a pure python one, each test runs on both (numpy only where it's installed).
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+
+@pytest.fixture(params=["pure", "numpy"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    numpy = pytest.importorskip("numpy") if request.param == "numpy" else None
+    monkeypatch.setattr(vectors, "backend", lambda: numpy)
+
+def floats(*values: float) -> FloatArray:
+    return FloatArray.of(array("d", values))
+
+def test_loading_vectors_does_not_import_numpy():
+    code: str = "import sys, pylox.natives.vectors; print('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.stdout == "False\n"
+
+def test_arithmetic(backend):
+    left, right = floats(1.0, 2.0, 3.0), floats(4.0, 5.0, 8.0)
+    result = left.binary(TokenType.PLUS, right, False)
+    assert result.data == array("d", [5.0, 7.0, 11.0]) and result.data.typecode == "d" # the ufunc wrote into the result array
+    assert left.binary(TokenType.MINUS, 1.0, False).data == array("d", [0.0, 1.0, 2.0])
+    assert left.binary(TokenType.MINUS, 1.0, True).data == array("d", [0.0, -1.0, -2.0]) # 1 - left
+    assert right.binary(TokenType.SLASH, left, False).data == array("d", [4.0, 2.5, 8.0 / 3.0])
+    assert left.data == array("d", [1.0, 2.0, 3.0]) and right.data == array("d", [4.0, 5.0, 8.0])
+
+def test_comparisons_give_floats(backend):
+    left = floats(1.0, 5.0, 3.0)
+    result = left.binary(TokenType.GREATER, floats(2.0, 2.0, 3.0), False)
+    assert result.data == array("d", [0.0, 1.0, 0.0]) and result.data.typecode == "d"
+    assert left.binary(TokenType.LESS_EQUAL, 3.0, False).data == array("d", [1.0, 0.0, 1.0])
+    assert left.binary(TokenType.LESS_EQUAL, 3.0, True).data == array("d", [0.0, 1.0, 1.0]) # 3 <= left
+
+def test_empty_arrays(backend):
+    empty = floats()
+    assert empty.binary(TokenType.STAR, floats(), False).data == array("d")
+    assert empty.binary(TokenType.GREATER, 1.0, True).data == array("d")
+    assert empty.sum() == 0.0 and empty.dot(floats()) == 0.0
+    with pytest.raises(NativeError, match="empty"): empty.min()
+    with pytest.raises(NativeError, match="empty"): empty.max()
+
+def test_reductions(backend):
+    values = floats(3.0, -1.0, 2.5)
+    assert (values.sum(), values.min(), values.max(), values.dot(floats(2.0, 2.0, 2.0))) == (4.5, -1.0, 3.0, 9.0)
+
+def test_bad_operands(backend):
+    with pytest.raises(NativeError, match="same length"): floats(1.0).binary(TokenType.PLUS, floats(1.0, 2.0), False)
+    with pytest.raises(NativeError, match="divide by zero"): floats(1.0).binary(TokenType.SLASH, floats(0.0), False)
+    with pytest.raises(NativeError, match="divide by zero"): floats(0.0).binary(TokenType.SLASH, 1.0, True)
+    assert floats(1.0).binary(TokenType.PLUS, "a", False) is NotImplemented
+    assert floats(1.0).binary(TokenType.EQUAL_EQUAL, floats(1.0), False) is NotImplemented
@@ -0,0 +1,55 @@
+import sys
+import time
+import timeit
+import tracemalloc
+from pylox.scanner import Scanner
+from pylox.parser import Parser
+from pylox.expr import Expr, Binary, Literal
+from pylox.tokens import Token
+from pylox.tokentype import TokenType
+from pylox.stmt import Stmt
+
+# Parse time and memory held by the AST of a large generated script.
+# Usage: python -m tool.bench_ast [function_count]
+
+def generate(functions: int) -> str:
+    src: list[str] = []
+    for i in range(functions):
+        src.append(f"fun f{i}(a, b) {{ var c = a * {i} + b; if (c > {i}) {{ c = c - (a + b) / 2; }} else {{ c = -c; }} "
+                   f"for (var j = 0; j < 3; j = j + 1) {{ c = c + j; }} return c + a * b - {i}; }}")
+        src.append(f"var v{i} = f{i}({i}, {i} + 1) + (v{i - 1} or 0);" if i else "var v0 = f0(0, 1);")
+    return "\n".join(src)
+
+def count_nodes(node: object) -> int:
+    if isinstance(node, list): return sum(count_nodes(n) for n in node)
+    if not isinstance(node, (Expr, Stmt)): return 0
+    return 1 + sum(count_nodes(getattr(node, f)) for f in node.__dataclass_fields__)
+
+def main() -> None:
+    functions: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    src: str = generate(functions)
+    tokens = Scanner(src).scan_tokens()
+    sys.setrecursionlimit(10000)
+
+    best: float = float("inf")
+    for _ in range(3):
+        start: float = time.perf_counter()
+        Parser(list(tokens)).parse()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    statements: list[Stmt] = Parser(list(tokens)).parse()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes: int = count_nodes(statements)
+    print(f"{len(src) / 1e6:.2f} MB source, {len(tokens)} tokens, {nodes} nodes")
+    print(f"parse: {best * 1e3:.0f} ms ({best / nodes * 1e9:.0f} ns/node)")
+    print(f"AST memory: {held / 1e6:.1f} MB ({held / nodes:.0f} B/node)")
+
+    plus: Token = Token(TokenType.PLUS, "+", None, 0)
+    construct: float = min(timeit.repeat(lambda: Binary(Literal(1.0), plus, Literal(2.0)), number=200_000, repeat=5)) / 600_000
+    print(f"node construction: {construct * 1e9:.0f} ns/node")
+
+if __name__ == "__main__":
+    main()
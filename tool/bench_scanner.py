@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from pylox.scanner import Scanner, RegexScanner, StreamingScanner, TokenStream
+from tool.bench_ast import generate
+
+# Scanner throughput in MB/s, the char at a time Scanner against RegexScanner, and peak memory of scanning
+# a whole file into a token list against streaming it through a TokenStream.
+# Usage: python -m tool.bench_scanner [script]
+
+def throughput(scanner: type[Scanner], src: str) -> float:
+    best: float = float("inf")
+    for _ in range(3):
+        start: float = time.perf_counter()
+        scanner(src).scan_tokens()
+        best = min(best, time.perf_counter() - start)
+    return len(src.encode()) / 1e6 / best
+
+def scan_list(path: str) -> None:
+    with open(path, encoding="utf-8", mode="r") as file: tokens = RegexScanner(file.read()).scan_tokens()
+    for i in range(len(tokens)): tokens[i]
+
+def scan_stream(path: str) -> None:
+    with open(path, encoding="utf-8", mode="r") as file:
+        tokens: TokenStream = TokenStream(StreamingScanner(file).stream_tokens())
+        i: int = 0
+        while tokens[i].lexeme or i == 0: i += 1
+
+def peak_memory(scan, path: str) -> float:
+    tracemalloc.start()
+    scan(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+def main() -> None:
+    if len(sys.argv) > 1: report(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, "bench_scanner.lox")
+            with open(path, encoding="utf-8", mode="w") as file: file.write(generate(2000) + "\n/* block comment */ // line comment\n" * 2000)
+            report(path)
+
+def report(path: str) -> None:
+    with open(path, encoding="utf-8", mode="r") as file: src: str = file.read()
+    tokens: int = len(RegexScanner(src).scan_tokens())
+    print(f"{len(src.encode()) / 1e6:.2f} MB source, {tokens} tokens")
+    char: float = throughput(Scanner, src)
+    regex: float = throughput(RegexScanner, src)
+    print(f"Scanner          {char:6.2f} MB/s")
+    print(f"RegexScanner     {regex:6.2f} MB/s ({regex / char:.1f}x)")
+    print(f"peak memory, token list  {peak_memory(scan_list, path):6.1f} MB")
+    print(f"peak memory, TokenStream {peak_memory(scan_stream, path):6.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Callable
+from pylox.lox_class import LoxClass
+from pylox.lox_instance import LoxInstance
+from pylox.inline_cache import InlineCache, SetCache
+from pylox.tokens import Token
+from pylox.tokentype import TokenType
+
+# Microbenchmark for instance storage: the old layout (a dict of fields per instance, what LoxInstance used to
+# be) against shapes (one shared Shape per field layout and a list of values per instance, read and written
+# through per site caches). Reports memory per instance and field get/set throughput. Pass a .lox file to also
+# time it end to end.
+# Usage: python -m tool.bench_shapes [script]
+
+N: int = 1_000_000
+INSTANCES: int = 100_000
+
+class DictInstance: # LoxInstance before shapes, fields looked up and stored by name
+    def __init__(self, klass: LoxClass, fields: dict[str, object]):
+        self.klass = klass
+        self.fields = fields
+
+    def get(self, name: Token) -> object:
+        if name.lexeme in self.fields: return self.fields[name.lexeme]
+        method = self.klass.find_method(name.lexeme)
+        if method is not None: return method.bind(self)
+
+    def set(self, name: Token, value: object) -> None:
+        self.fields[name.lexeme] = value
+
+def names(count: int) -> list[Token]:
+    return [Token(TokenType.IDENTIFIER, f"f{i}", None, 0) for i in range(count)]
+
+def bytes_per_instance(make: Callable[[], object]) -> float:
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    instances: list[object] = [make() for _ in range(INSTANCES)]
+    used: int = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return (used - sys.getsizeof(instances)) / len(instances)
+
+def main() -> None:
+    klass: LoxClass = LoxClass("Point", [], {}, [])
+    klass.build_vtables()
+    print(f"{'fields':<7} {'dict B/obj':>11} {'shape B/obj':>12} {'dict get':>9} {'shape get':>10} {'dict set':>9} {'shape set':>10}   (ns/op)")
+    for count in (2, 4, 8):
+        fields: list[Token] = names(count)
+        def make_dict() -> DictInstance:
+            instance: DictInstance = DictInstance(klass, {})
+            for name in fields: instance.set(name, 1.0)
+            return instance
+        set_caches: list[SetCache] = [SetCache() for _ in fields]
+        def make_shape() -> LoxInstance:
+            instance: LoxInstance = LoxInstance(klass)
+            for name, cache in zip(fields, set_caches): instance.set(name, 1.0, cache)
+            return instance
+        dict_bytes, shape_bytes = bytes_per_instance(make_dict), bytes_per_instance(make_shape)
+
+        name: Token = fields[-1]
+        d: DictInstance = make_dict()
+        s: LoxInstance = make_shape()
+        get_cache: InlineCache = InlineCache()
+        set_cache: SetCache = SetCache()
+        timing: list[float] = [min(timeit.repeat(f, number=N, repeat=3)) / N * 1e9 for f in (
+            lambda: d.get(name), lambda: s.get(name, get_cache), lambda: d.set(name, 2.0), lambda: s.set(name, 2.0, set_cache))]
+        print(f"{count:<7} {dict_bytes:>11.0f} {shape_bytes:>12.0f} {timing[0]:>9.1f} {timing[1]:>10.1f} {timing[2]:>9.1f} {timing[3]:>10.1f}")
+
+    if len(sys.argv) > 1:
+        from pylox.pylox import Pylox
+        start: float = time.perf_counter()
+        Pylox.run_file(sys.argv[1])
+        print(f"{sys.argv[1]}: {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
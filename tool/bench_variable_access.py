@@ -0,0 +1,52 @@
+import sys
+import time
+import timeit
+from pylox.environment import Environment, Slot, Cell, LOCAL, CELL, UPVALUE
+from pylox.expr import Variable
+from pylox.interpreter import Interpreter
+from pylox.tokens import Token
+from pylox.tokentype import TokenType
+
+# Microbenchmark for resolved variable reads in the tree-walker: Interpreter.lookup_variable on a frame slot
+# (a plain local, a local boxed in a Cell because a closure captures it, and an upvalue read through the closure's
+# cells) against the Environment chain walk of Environment.get_at that locals used before frames.
+# Pass a .lox file to also time it end to end.
+# Usage: python -m tool.bench_variable_access [script]
+
+N: int = 1_000_000
+
+def chain(depth: int) -> Environment:
+    env: Environment = Environment()
+    env.define(1.0)
+    for _ in range(depth): env = Environment(env)
+    return env
+
+def variable(kind: int, index: int) -> Variable:
+    expr: Variable = Variable(Token(TokenType.IDENTIFIER, "a", None, 0))
+    expr.slot.kind, expr.slot.index = kind, index
+    return expr
+
+def main() -> None:
+    interpreter: Interpreter = Interpreter()
+    interpreter.frame = [0.0, 1.0, Cell(1.0)]
+    interpreter.upvalues = [Cell(1.0)]
+    print(f"{'read':<10} {'ns/read':>8}   ({N} reads through Interpreter.lookup_variable)")
+    for label, expr in (("local", variable(LOCAL, 1)), ("cell", variable(CELL, 2)), ("upvalue", variable(UPVALUE, 0))):
+        ns: float = min(timeit.repeat(lambda: interpreter.lookup_variable(expr.name, expr), number=N, repeat=3)) / N * 1e9
+        print(f"{label:<10} {ns:>8.1f}")
+    print(f"\n{'depth':<10} {'ns/read':>8}   (the old Environment.get_at walk, for comparison)")
+    for depth in (0, 1, 2, 4):
+        env: Environment = chain(depth)
+        slot: Slot = Slot()
+        slot.depth, slot.idx = depth, 0
+        ns = min(timeit.repeat(lambda: env.get_at(slot.depth, "a", slot.idx), number=N, repeat=3)) / N * 1e9
+        print(f"{depth:<10} {ns:>8.1f}")
+
+    if len(sys.argv) > 1:
+        from pylox.pylox import Pylox
+        start: float = time.perf_counter()
+        Pylox.run_file(sys.argv[1])
+        print(f"{sys.argv[1]}: {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
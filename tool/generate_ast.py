@@ -7,21 +7,23 @@ def main_expr():
         sys.exit(64)
     output_dir: str = sys.argv[1]
     define_ast(output_dir, "Expr", [
-        "Assign     = name: Token, value: Expr",
-        "Binary     = left: Optional[Expr], operator: Token, right: Optional[Expr]",
+        "Assign     = name: Token, value: Expr, slot: Slot = field(default_factory=Slot)",
+        "Binary     = left: Optional[Expr], operator: Token, right: Optional[Expr], float_op: object = None",
         "Call       = callee: Expr, paren: Token, arguments: list[Expr]",
-        "Get        = obj: Expr, name: Token",
-        "Lambda     = params: list[Token], body: list[Stmt | None]",
+        "Get        = obj: Expr, name: Token, cache: InlineCache = field(default_factory=InlineCache)",
+        "Index      = obj: Expr, bracket: Token, index: Expr",
+        "Lambda     = params: list[Token], body: list[Stmt | None], layout: FrameLayout = field(default_factory=FrameLayout)",
         "Grouping   = expression: Expr",
         "Literal    = value: object",
         "Logical    = left: Expr, operator: Token, right: Expr",
-        "Set        = obj: Expr, name: Token, value: Expr",
-        "Super      = keyword: Token, method: Token",
-        "Inner      = keyword: Token, method: Token",
-        "This       = keyword: Token",
+        "Set        = obj: Expr, name: Token, value: Expr, cache: SetCache = field(default_factory=SetCache)",
+        "SetIndex   = obj: Expr, bracket: Token, index: Expr, value: Expr",
+        "Super      = keyword: Token, method: Token, slot: Slot = field(default_factory=Slot), this_slot: Slot = field(default_factory=Slot)",
+        "Inner      = keyword: Token, method: Token, slot: Slot = field(default_factory=Slot)",
+        "This       = keyword: Token, slot: Slot = field(default_factory=Slot)",
         "Unary      = operator: Token, right: Expr",
         "Ternary    = condition: Expr, operator1: Token, expr_if_true: Expr, operator2: Token, expr_if_false: Expr",
-        "Variable   = name: Token"
+        "Variable   = name: Token, slot: Slot = field(default_factory=Slot)"
     ])
 
 def main_stmt():
@@ -32,13 +34,13 @@ def main_stmt():
     define_ast(output_dir, "Stmt", [
         "Break      = ",
         "Block      = statements: list[Stmt | None]",
-        "Class      = name: Token, superclasses: list[Variable], methods: list[Function], class_methods: list[Function]",
+        "Class      = name: Token, superclasses: list[Variable], methods: list[Function], class_methods: list[Function], slot: Slot = field(default_factory=Slot), super_slot: Slot = field(default_factory=Slot)",
         "Expression = expression: Expr",
-        "Function   = name: Token, params: list[Token], body: list[Stmt | None], is_getter: bool",
+        "Function   = name: Token, params: list[Token], body: list[Stmt | None], is_getter: bool, slot: Slot = field(default_factory=Slot), layout: FrameLayout = field(default_factory=FrameLayout)",
         "If         = condition: Expr, then_branch: Stmt, else_branch: Optional[Stmt]",
         "Print      = expression: Expr",
         "Return     = keyword: Token, value: Optional[Expr]",
-        "Var        = name: Token, initializer: Expr | UnInitValue",
+        "Var        = name: Token, initializer: Expr | UnInitValue, slot: Slot = field(default_factory=Slot)",
         "While      = condition: Expr, body: Stmt"
     ])
 
@@ -50,7 +52,7 @@ def define_ast(output_dir: str, base_name: str, types: list[str]) -> None:
             file.write("\n")
             file.write("from abc import ABC, abstractmethod")
             file.write("\n")
-            file.write("from dataclasses import dataclass")
+            file.write("from dataclasses import dataclass, field")
             file.write("\n")
             file.write("from typing import Protocol, Optional")
             file.write("\n")
@@ -59,8 +61,12 @@ def define_ast(output_dir: str, base_name: str, types: list[str]) -> None:
                 file.write("\n")
                 file.write("from pylox.expr import Expr, Variable")
                 file.write("\n")
-                file.write("from pylox.environment import UnInitValue")
+                file.write("from pylox.environment import UnInitValue, Slot, FrameLayout")
             if sys._getframe(1).f_code.co_name == "main_expr": # checksif define_ast() was called by main_stmt() 
+                file.write("\n")
+                file.write("from pylox.environment import Slot, FrameLayout")
+                file.write("\n")
+                file.write("from pylox.inline_cache import InlineCache, SetCache")
                 file.write("\n")
                 file.write("from typing import TYPE_CHECKING")
                 file.write("\n\n")
@@ -80,20 +86,22 @@ def define_ast(output_dir: str, base_name: str, types: list[str]) -> None:
             file.write("\n\n")
             file.write(f"class {base_name}(ABC):")
             file.write("\n\t")
+            file.write("__slots__ = ()")
+            file.write("\n\t")
             file.write("@abstractmethod")
             file.write("\n\t")
             file.write("def accept(self, visitor: Visitor): ...")
 
             for type in types:
                 class_name = type.split("=")[0].strip()
-                fields = type.split("=")[1].strip()
+                fields = type.split("=", 1)[1].strip()
                 define_type(file, base_name, class_name, fields)
 
     except FileNotFoundError: print("File Path Invalid") 
 
 def define_type(file: TextIO, base_name: str, class_name: str, fields: str) -> None:
     file.write("\n\n")
-    file.write("@dataclass(frozen=True, eq=False)")
+    file.write("@dataclass(eq=False, slots=True)")
     file.write("\n")
     file.write(f"class {class_name}({base_name}):")
 